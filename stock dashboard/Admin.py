@@ -0,0 +1,49 @@
+import pandas as pd
+import streamlit as st
+
+from metrics import METRICS, available_profilers
+
+
+def show_admin():
+    st.title("Admin - Performa Aplikasi")
+    st.caption(f"Metrik proses ini sejak {pd.Timestamp(METRICS.started_at, unit='s'):%Y-%m-%d %H:%M:%S} UTC")
+
+    st.subheader("Latensi per Tahap")
+    stages = pd.DataFrame(METRICS.stage_rows())
+    if stages.empty:
+        st.info("Belum ada data.")
+    else:
+        st.dataframe(stages.set_index('stage'), use_container_width=True)
+
+    st.subheader("Cache")
+    caches = pd.DataFrame(METRICS.cache_rows())
+    if not caches.empty:
+        st.dataframe(caches.set_index('cache'), use_container_width=True)
+
+    ticker_stages = METRICS.ticker_stages()
+    if ticker_stages:
+        st.subheader("Per Ticker")
+        stage = st.selectbox("Tahap", ticker_stages)
+        st.dataframe(pd.DataFrame(METRICS.ticker_rows(stage)).set_index('ticker'), use_container_width=True)
+
+    st.subheader("Ekspor")
+    col1, col2 = st.columns(2)
+    col1.download_button("Prometheus", METRICS.prometheus(), file_name="metrics.prom", mime="text/plain")
+    col2.download_button("JSON lines", METRICS.jsonl(), file_name="metrics.jsonl", mime="application/x-ndjson")
+
+    st.subheader("Profiling")
+    kind = st.radio("Profiler", available_profilers(), horizontal=True)
+    if st.button("Profil rerun berikutnya"):
+        # Picked up by App.py on this session's next run, i.e. the next page
+        # opened; ?profile=<kind> in the URL does the same for one rerun.
+        st.session_state['profile_next'] = kind
+        st.success("Buka halaman lain; satu rerun akan diprofil.")
+    if METRICS.last_profile:
+        profile = METRICS.last_profile
+        st.caption(f"{profile['kind']} - {profile['label']} - "
+                   f"{pd.Timestamp(profile['at'], unit='s'):%Y-%m-%d %H:%M:%S} UTC")
+        st.code(profile['report'])
+
+    if st.button("Reset metrik"):
+        METRICS.reset()
+        st.rerun()
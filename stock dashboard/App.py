@@ -1,17 +1,48 @@
+import os
+from contextlib import nullcontext
+
 import streamlit as st
 
+from metrics import METRICS
+
 
 PAGES = {
     "Dashboard": "Dashboard",
-    "Forecasting": "Forecasting"
+    "Forecasting": "Forecasting",
+    "Screener": "Screener"
 }
 
+# The Admin page and profiling are only available when the URL carries
+# ?admin=<STOCK_ADMIN_TOKEN>.
+ADMIN_TOKEN = os.environ.get("STOCK_ADMIN_TOKEN")
+is_admin = bool(ADMIN_TOKEN) and st.query_params.get("admin") == ADMIN_TOKEN
+if is_admin:
+    PAGES["Admin"] = "Admin"
+
 st.sidebar.title("Navigasi")
 selection = st.sidebar.radio("Pilih Halaman", list(PAGES.keys()))
 
-if selection == "Dashboard":
-    from Dashboard import show_dashboard
-    show_dashboard()
-elif selection == "Forecasting":
-    from Forecasting import show_forecasting
-    show_forecasting()
+# One-shot profiling of this rerun, requested from the Admin page or with
+# ?profile=cprofile|pyinstrument.
+profile = st.session_state.pop("profile_next", None) or st.query_params.get("profile")
+if "profile" in st.query_params:
+    del st.query_params["profile"]
+if not is_admin:
+    profile = None
+
+with METRICS.profile(profile, label=selection) if profile else nullcontext(), METRICS.timer(f"page:{selection}"):
+    if selection == "Dashboard":
+        from Dashboard import show_dashboard
+        show_dashboard()
+    elif selection == "Forecasting":
+        from Forecasting import show_forecasting
+        show_forecasting()
+    elif selection == "Screener":
+        from Screener import show_screener
+        show_screener()
+    elif selection == "Admin":
+        from Admin import show_admin
+        show_admin()
+
+if os.environ.get("STOCK_METRICS_DIR"):
+    METRICS.export(os.environ["STOCK_METRICS_DIR"])
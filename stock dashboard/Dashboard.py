@@ -1,43 +1,64 @@
 import streamlit as st
-import yfinance as yf
-import plotly.graph_objects as go
-from PIL import Image
-import io
-import requests
+from price_store import open_store
+from logos import open_logo_cache
+from artifacts import precomputed_summary
+from panel import Panel
+from live_view import live_panel
+from charts import CANDLESTICK, CHART_TYPES, ChartFactory
 
-def show_dashboard():
- 
-    logo_urls = {
-        'GOOGL': 'https://logo.clearbit.com/google.com',
-        'AAPL': 'https://logo.clearbit.com/apple.com',
-        'MSFT': 'https://logo.clearbit.com/microsoft.com',
-        'NVDA': 'https://logo.clearbit.com/nvidia.com',
-        'TSLA': 'https://logo.clearbit.com/tesla.com',
-        'INTC': 'https://logo.clearbit.com/intel.com'
-    }
+
+@st.cache_resource
+def get_price_store():
+    return open_store()
+
+
+@st.cache_resource
+def get_logo_cache():
+    return open_logo_cache()
+
+
+@st.cache_resource
+def get_chart_factory():
+    return ChartFactory()
+
+
+@st.cache_resource(ttl=60, max_entries=64)
+def _load_panel(tickers, period):
+    data, errors = get_price_store().get(list(tickers), period=period)
+    return Panel.from_frames(data), errors
 
 
+def load_panel(tickers, period="1y"):
+    # Shared by every session asking for the same set of tickers, in any
+    # order: the cache key is the sorted set. Also used by stockapp.py.
+    return _load_panel(tuple(sorted(set(tickers))), period)
+
+
+def show_dashboard():
+
     def get_stock_data(tickers):
-        data = {}
-        for ticker in tickers:
-            stock = yf.Ticker(ticker)
-            hist = stock.history(period="1y")  
-            data[ticker] = hist
+        data, errors = load_panel(tuple(tickers))
+        if errors:
+            st.warning("Gagal mengambil data untuk: " + ", ".join(f"{t} ({e})" for t, e in errors.items()))
         return data
 
-    #
-    def get_company_logo(ticker):
-        return logo_urls.get(ticker, 'https://via.placeholder.com/150')  
-
     st.markdown("<h1 style='text-align: center;'>Dashboard Harga Saham</h1>", unsafe_allow_html=True)
     st.sidebar.header("Pengaturan")
 
     tickers_input = st.sidebar.text_area("Masukkan Ticker Saham (pisahkan dengan koma)", value="GOOGL, AAPL, MSFT, NVDA, TSLA, INTC")
     tickers = [ticker.strip().upper() for ticker in tickers_input.split(',') if ticker.strip()]
+    live_mode = st.sidebar.toggle("Mode Live", value=False)
 
     if tickers:
         st.write(f"Menampilkan data untuk {', '.join(tickers)}")
         data = get_stock_data(tickers)
+        tickers = [ticker for ticker in tickers if ticker in data]
+        if not tickers:
+            return
+        summary = precomputed_summary(data, tickers)
+        if live_mode:
+            st.subheader("Live")
+            live_panel(tickers)
 
         st.subheader("Informasi Saham")
 
@@ -48,23 +69,21 @@ def show_dashboard():
         for ticker in tickers:
             chart_types[ticker] = st.sidebar.selectbox(
                 f"Pilih jenis grafik untuk {ticker}",
-                ('Candlestick dengan Volume', 'Line Plot'),
+                CHART_TYPES,
                 index=0  
             )
 
+        get_logo_cache().prefetch(tickers)
         for idx, ticker in enumerate(tickers):
             with cols[idx]:
               
-                logo_url = get_company_logo(ticker)
-                response = requests.get(logo_url)
-                logo = Image.open(io.BytesIO(response.content))
+                logo_src = get_logo_cache().src(ticker)
 
-                df = data[ticker]
-                current_value = df['Close'].iloc[-1]
-                previous_value = df['Close'].iloc[-2]
+                row = summary.loc[ticker]
+                current_value = row['Close']
 
-                performance_color = 'green' if current_value > previous_value else 'red'
-                performance_text = 'Naik' if current_value > previous_value else 'Turun'
+                performance_color = 'green' if row['Status'] == 'Up' else 'red'
+                performance_text = 'Naik' if row['Status'] == 'Up' else 'Turun'
 
                 st.markdown(f"""
                 <div style="
@@ -76,12 +95,15 @@ def show_dashboard():
                     margin: 10px;
                 ">
                     <h3>{ticker}</h3>
-                    <img src="{logo_url}" width="100" style="border-radius: 8px;" />
+                    <img src="{logo_src}" width="100" style="border-radius: 8px;" />
                     <p>Nilai Terkini: ${current_value:,.2f}</p>
                     <p style="color:{performance_color}; font-weight:bold;">{performance_text}</p>
                 </div>
                 """, unsafe_allow_html=True)
 
+        st.subheader("Ringkasan Pasar")
+        st.dataframe(summary, use_container_width=True)
+
         st.divider()
 
         for i in range(0, len(tickers), 2):
@@ -92,63 +114,9 @@ def show_dashboard():
                     df = data[ticker]
                     cols[j].subheader(f"Grafik Harga Saham {ticker}")
 
-                    fig = go.Figure()
-
-                    if chart_types[ticker] == 'Candlestick dengan Volume':
-                        
-                        fig.add_trace(go.Candlestick(
-                            x=df.index,
-                            open=df['Open'],
-                            high=df['High'],
-                            low=df['Low'],
-                            close=df['Close'],
-                            name='Candlestick'
-                        ))
-
-                     
-                        fig.add_trace(go.Bar(
-                            x=df.index,
-                            y=df['Volume'],
-                            name='Volume',
-                            yaxis='y2',
-                            marker=dict(color='rgba(0, 100, 250, 0.5)')
-                        ))
-
-                    
-                        fig.update_layout(
-                            title=f'Candlestick dan Volume Saham {ticker}',
-                            xaxis_title='Tanggal',
-                            yaxis_title='Harga',
-                            yaxis2=dict(
-                                title='Volume',
-                                overlaying='y',
-                                side='right'
-                            ),
-                            xaxis_rangeslider_visible=False
-                        )
+                    if chart_types[ticker] == CANDLESTICK:
+                        title = f'Candlestick dan Volume Saham {ticker}'
                     else:
-                      
-                        fig.add_trace(go.Scatter(
-                            x=df.index,
-                            y=df['Open'],
-                            mode='lines',
-                            name='Harga Pembuka',
-                            line=dict(color='royalblue')
-                        ))
-
-                        fig.add_trace(go.Scatter(
-                            x=df.index,
-                            y=df['Close'],
-                            mode='lines',
-                            name='Harga Penutup',
-                            line=dict(color='firebrick')
-                        ))
-
-                    
-                        fig.update_layout(
-                            title=f'Line Plot Harga Saham {ticker}',
-                            xaxis_title='Tanggal',
-                            yaxis_title='Harga',
-                        )
-
+                        title = f'Line Plot Harga Saham {ticker}'
+                    fig = get_chart_factory().figure(ticker, chart_types[ticker], df, title=title)
                     cols[j].plotly_chart(fig, use_container_width=True) 
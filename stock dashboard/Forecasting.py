@@ -1,9 +1,81 @@
 import streamlit as st
-import yfinance as yf
 import pandas as pd
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestRegressor
 import plotly.graph_objects as go
+from Dashboard import get_price_store
+from forecast_cache import ForecastCache, fingerprint
+from features import FeatureCache, feature_names
+from model_registry import ModelRegistry, train_forest
+from metrics import METRICS
+
+
+@st.cache_resource
+def get_forecast_cache():
+    return ForecastCache()
+
+
+@st.cache_resource
+def get_model_registry():
+    return ModelRegistry()
+
+
+@st.cache_resource(max_entries=64)
+def get_feature_cache(ticker):
+    return FeatureCache()
+
+
+def forecast_random_forest(df, n_estimators=100, test_size=0.2, ticker=None):
+    params = dict(model='random_forest', n_estimators=n_estimators, max_depth=None,
+                  min_samples_split=2, test_size=test_size, features=feature_names())
+
+    def fit():
+        from sklearn.ensemble import RandomForestRegressor
+        from sklearn.model_selection import train_test_split
+
+        X = df[feature_names()]
+        y = df['Close']
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, shuffle=False)
+
+        model = RandomForestRegressor(n_estimators=n_estimators, max_depth=None, min_samples_split=2)
+        with METRICS.timer('random_forest_fit', ticker):
+            model.fit(X_train, y_train)
+
+        forecast = model.predict(X_test)
+        return pd.DataFrame({'Date': X_test.index, 'Actual': y_test, 'Forecast': forecast})
+
+    return get_forecast_cache().get_or_compute(fingerprint(df['Close'], params), fit)
+
+
+def forecast_forward(ticker, df, steps=40, n_estimators=100, max_stale_bars=5, keep=2, n_jobs=-1):
+    # Inference against the latest registered forest for the ticker; it is
+    # only retrained here when missing or more than `max_stale_bars` behind,
+    # keeping the newest `keep` versions on disk. The trees' paths are rolled
+    # forward on `n_jobs` threads.
+    # scikit-learn loads here, on first use, not when the page is imported.
+    from ml_forecast import recursive_forecast
+
+    close = df[['Close']].rename(columns={'Close': ticker})
+    registry = get_model_registry()
+    name = f"rf-{ticker}"
+    model, meta = registry.load(name)
+    if model is None or (close.index > pd.Timestamp(meta['training_end'])).sum() > max_stale_bars:
+        # Sessions finding the same forest stale wait for one retrain. With
+        # keep >= 2 a version another session has just resolved survives the
+        # prune until it is loaded.
+        def retrain():
+            train_forest(registry, name, close, n_estimators=n_estimators)
+            registry.prune(name, keep=keep)
+
+        registry.flights.do(name, retrain)
+        model, meta = registry.load(name)
+    params = dict(model='random_forest_recursive', name=name, version=meta['version'], steps=steps)
+
+    def predict():
+        with METRICS.timer('random_forest_predict', ticker):
+            result = recursive_forecast(model, close, steps=steps, n_jobs=n_jobs)
+        return pd.DataFrame({name: frame[ticker] for name, frame in result.items()})
+
+    return get_forecast_cache().get_or_compute(fingerprint(df['Close'], params), predict)
+
 
 def show_forecasting():
     st.set_page_config(
@@ -17,22 +89,15 @@ def show_forecasting():
 
     if ticker:
   
-        stock = yf.Ticker(ticker)
-        df = stock.history(period="2y") 
-        df['Return'] = df['Close'].pct_change()
-        df['Lag_1'] = df['Close'].shift(1)
-        df.dropna(inplace=True)
-
-        X = df[['Lag_1']]
-        y = df['Close']
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, shuffle=False)
+        data, errors = get_price_store().get([ticker], period="2y")
+        if ticker not in data:
+            st.error(f"Gagal mengambil data untuk {ticker}: {errors.get(ticker)}")
+            return
+        df = data[ticker]
+        features = get_feature_cache(ticker).frame(df[['Close']].rename(columns={'Close': ticker}))
+        df = df.join(features.xs(ticker, level='Ticker')).dropna()
 
-
-        model = RandomForestRegressor(n_estimators=100, max_depth=None, min_samples_split=2)
-        model.fit(X_train, y_train)
-
-        forecast = model.predict(X_test)
-        forecast_df = pd.DataFrame({'Date': X_test.index, 'Actual': y_test, 'Forecast': forecast})
+        forecast_df = forecast_random_forest(df, ticker=ticker)
         
         fig = go.Figure()
         fig.add_trace(go.Scatter(x=forecast_df['Date'], y=forecast_df['Actual'], mode='lines', name='Actual'))
@@ -45,3 +110,25 @@ def show_forecasting():
         )
 
         st.plotly_chart(fig, use_container_width=True)
+
+        forward = forecast_forward(ticker, data[ticker])
+
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=df.index, y=df['Close'], mode='lines', name='Actual'))
+        fig.add_trace(go.Scatter(
+            x=forward.index.tolist() + forward.index.tolist()[::-1],
+            y=forward['lower'].tolist() + forward['upper'].tolist()[::-1],
+            fill='toself',
+            fillcolor='rgba(0, 100, 250, 0.2)',
+            line=dict(color='rgba(255, 255, 255, 0)'),
+            name='Interval 90%'
+        ))
+        fig.add_trace(go.Scatter(x=forward.index, y=forward['forecast'], mode='lines', name='Forecast'))
+
+        fig.update_layout(
+            title=f'Forecast {len(forward)} Hari ke Depan {ticker}',
+            xaxis_title='Tanggal',
+            yaxis_title='Harga'
+        )
+
+        st.plotly_chart(fig, use_container_width=True)
@@ -0,0 +1,96 @@
+import streamlit as st
+import plotly.graph_objects as go
+from Dashboard import load_panel
+from summary import market_summary
+from screener import RollingCorrelation, parse_filter, returns_matrix, screen, top_movers
+from metrics import METRICS
+
+# Past this many tickers the heatmap is unreadable; the strongest movers
+# among the screened ones are shown.
+HEATMAP_MAX = 50
+
+
+@st.cache_resource(max_entries=32)
+def get_rolling_correlation(columns, window):
+    # One per ticker set and window, shared by every session so each refresh
+    # only folds in the bars that arrived since the last one.
+    return RollingCorrelation(window)
+
+
+def show_screener():
+    st.markdown("<h1 style='text-align: center;'>Screener Saham</h1>", unsafe_allow_html=True)
+    st.sidebar.header("Pengaturan Screener")
+
+    tickers_input = st.sidebar.text_area("Masukkan Ticker Saham (pisahkan dengan koma)", value="GOOGL, AAPL, MSFT, NVDA, TSLA, INTC, AMZN, META, AMD, NFLX")
+    tickers = list(dict.fromkeys(ticker.strip().upper() for ticker in tickers_input.split(',') if ticker.strip()))
+    benchmark = st.sidebar.text_input("Benchmark", value="SPY").strip().upper()
+    window = st.sidebar.slider("Jendela korelasi (hari)", min_value=20, max_value=250, value=60)
+    movers = st.sidebar.slider("Jumlah top movers", min_value=3, max_value=25, value=5)
+    use_change = st.sidebar.checkbox("Filter Change %", value=False)
+    min_change = st.sidebar.number_input("Change % lebih dari", value=2.0, step=0.5, disabled=not use_change)
+    use_high = st.sidebar.checkbox("Dekat 52W High", value=False)
+    near_high = st.sidebar.slider("Maksimal % di bawah 52W High", min_value=0.0, max_value=25.0, value=5.0, step=0.5, disabled=not use_high)
+    extra = st.sidebar.text_input("Filter tambahan (pisahkan dengan ;)", placeholder="Return 1M % > 5; Beta < 1.5")
+    refresh = st.sidebar.toggle("Refresh otomatis", value=False)
+
+    if not tickers:
+        return
+
+    filters = []
+    if use_change:
+        filters.append(('Change %', '>', min_change))
+
+    @st.fragment(run_every=5 if refresh else None)
+    def results():
+        universe = tuple(dict.fromkeys(tickers + [benchmark] if benchmark else tickers))
+        data, errors = load_panel(universe)
+        if errors:
+            st.warning("Gagal mengambil data untuk: " + ", ".join(f"{t} ({e})" for t, e in errors.items()))
+        available = [ticker for ticker in tickers if ticker in data]
+        if not available:
+            return
+
+        with METRICS.timer('screener'):
+            returns = returns_matrix(data)
+            rolling = get_rolling_correlation(tuple(returns.columns), window).update(returns)
+            corr = rolling.corr()
+            summary = market_summary(data)
+            if benchmark in data:
+                summary['Beta'] = rolling.beta(benchmark)
+                summary[f'Korelasi {benchmark}'] = corr[benchmark]
+            summary = summary.loc[available]
+
+            active = list(filters)
+            for text in extra.split(';'):
+                if text.strip():
+                    try:
+                        active.append(parse_filter(text, summary.columns))
+                    except ValueError as e:
+                        st.warning(f"Filter diabaikan: {e}")
+            screened = screen(summary, active, near_high=near_high if use_high else None)
+            gainers, losers = top_movers(summary, movers)
+
+        st.caption(f"{len(screened)} dari {len(available)} saham lolos filter")
+        cols = st.columns(2)
+        cols[0].subheader("Kenaikan Terbesar")
+        cols[0].dataframe(gainers[['Close', 'Change %']], use_container_width=True)
+        cols[1].subheader("Penurunan Terbesar")
+        cols[1].dataframe(losers[['Close', 'Change %']], use_container_width=True)
+
+        st.subheader("Hasil Screener")
+        st.dataframe(screened, use_container_width=True)
+
+        shown = screened.index if len(screened) else summary.index
+        if len(shown) > HEATMAP_MAX:
+            shown = summary.loc[shown, 'Change %'].abs().nlargest(HEATMAP_MAX).index
+            st.caption(f"Heatmap dibatasi pada {HEATMAP_MAX} saham dengan perubahan terbesar")
+        matrix = corr.loc[shown, shown]
+        st.subheader(f"Korelasi Return ({window} hari)")
+        fig = go.Figure(go.Heatmap(
+            z=matrix.to_numpy(), x=list(matrix.columns), y=list(matrix.index),
+            zmin=-1, zmax=1, colorscale='RdBu', reversescale=True,
+        ))
+        fig.update_layout(height=max(400, 18 * len(shown)), yaxis_autorange='reversed')
+        st.plotly_chart(fig, use_container_width=True)
+
+    results()
@@ -0,0 +1,122 @@
+import functools
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from summary import align, market_summary
+
+
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'artifacts')
+
+
+def load_manifest(out_dir=DEFAULT_DIR):
+    try:
+        with open(os.path.join(out_dir, 'manifest.json')) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def load_summary(out_dir=DEFAULT_DIR):
+    try:
+        with open(os.path.join(out_dir, 'summary.json')) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+def load_forecast(ticker, out_dir=DEFAULT_DIR):
+    path = os.path.join(out_dir, 'forecasts', f"{ticker}.parquet")
+    return pd.read_parquet(path) if os.path.exists(path) else None
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+@functools.lru_cache(maxsize=4)
+def _cards(out_dir, mtime):
+    # summary.json as a frame, parsed once per version of the file; callers
+    # must not modify it.
+    cards = pd.DataFrame(load_summary(out_dir))
+    if cards.empty:
+        return cards
+    cards = cards.set_index('Ticker')
+    cards['Date'] = pd.to_datetime(cards['Date'])
+    return cards
+
+
+@functools.lru_cache(maxsize=4)
+def _manifest(out_dir, mtime):
+    return load_manifest(out_dir)
+
+
+def load_cards(out_dir=DEFAULT_DIR):
+    mtime = _mtime(os.path.join(out_dir, 'summary.json'))
+    return pd.DataFrame() if mtime is None else _cards(out_dir, mtime)
+
+
+def built_with(out_dir=DEFAULT_DIR):
+    # {ticker: manifest entry}: the history window and forecast parameters
+    # each ticker's artifacts were built with.
+    return _manifest(out_dir, _mtime(os.path.join(out_dir, 'manifest.json')))
+
+
+def fresh_tickers(cards, data, tickers, period='1y', out_dir=DEFAULT_DIR):
+    # Tickers whose precomputed card was built from the same history as
+    # `data` (a Panel or {ticker: frame}): the same `period` window, without
+    # --since, through the same last bar, date and close. A bar still
+    # forming when precompute ran, or any newer bar, makes a ticker stale.
+    manifest = built_with(out_dir)
+    tickers = [t for t in tickers
+               if manifest.get(t, {}).get('period') == period and manifest[t].get('since') is None]
+    if cards.empty or not tickers:
+        return []
+    close = align(data, 'Close')[list(tickers)]
+    values = close.to_numpy(dtype=float)
+    rows = len(values) - 1 - np.argmax(~np.isnan(values[::-1]), axis=0)
+    known = cards.reindex(tickers)
+    fresh = ((known['Date'].to_numpy() == close.index[rows].to_numpy())
+             & np.isclose(known['Close'].to_numpy(dtype=float), values[rows, np.arange(len(tickers))], rtol=1e-6))
+    return [ticker for ticker, ok in zip(tickers, fresh) if ok]
+
+
+def precomputed_summary(data, tickers, period='1y', out_dir=DEFAULT_DIR):
+    # market_summary(data).loc[tickers], read from summary.json for the
+    # tickers precompute has covered up to their latest bar and computed
+    # live only for the rest.
+    cards = load_cards(out_dir)
+    fresh = fresh_tickers(cards, data, tickers, period, out_dir)
+    if len(fresh) == len(tickers):
+        summary = cards.loc[tickers].copy()
+    else:
+        stale = [ticker for ticker in tickers if ticker not in fresh]
+        live = market_summary(data if hasattr(data, 'wide') else {t: data[t] for t in stale}).loc[stale]
+        summary = pd.concat([cards.loc[fresh], live]).loc[tickers, live.columns] if fresh else live
+    summary.index.name = 'Ticker'
+    return summary
+
+
+def precomputed_forecasts(data, tickers, params, period='1y', out_dir=DEFAULT_DIR):
+    # {(ticker, feature): (forecast, conf_int)} from the forecast artifacts
+    # of fresh tickers that precompute built with exactly `params` (the
+    # model's MODEL_PARAMS, horizon included).
+    manifest = built_with(out_dir)
+    forecasts = {}
+    for ticker in fresh_tickers(load_cards(out_dir), data, tickers, period, out_dir):
+        if manifest[ticker].get('forecasts', {}).get(params['model']) != params:
+            continue
+        frame = load_forecast(ticker, out_dir)
+        if frame is None:
+            continue
+        for feature, rows in frame[frame['model'] == params['model']].groupby('feature'):
+            if len(rows) != params['steps']:
+                continue
+            forecast = pd.Series(rows['forecast'].to_numpy())
+            forecasts[ticker, feature] = forecast, pd.Series((rows['upper'] - rows['lower']).to_numpy() / 2)
+    return forecasts
@@ -0,0 +1,212 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from batch_forecast import MODELS, parse_tickers
+from forecast_cache import ForecastCache
+from holt_winters import IncrementalHoltWinters
+from ml_forecast import fit_forest, recursive_forecast
+
+
+class HoltWintersForecaster:
+    # Warm-startable: the fitted state is carried from one fold's training
+    # window to the next and only refit on schedule or drift.
+    warm_start = True
+
+    def __init__(self, seasonal_periods=20, band=0.02, refit_every=60):
+        self.seasonal_periods = seasonal_periods
+        self.band = band
+        self.refit_every = refit_every
+        self.model = None
+
+    def fit(self, train):
+        if self.model is not None and self.model.extends(train):
+            self.model.advance(train)
+        else:
+            self.model = IncrementalHoltWinters(self.seasonal_periods, refit_every=self.refit_every).fit(train)
+
+    def forecast(self, steps):
+        point = self.model.forecast(steps).to_numpy()
+        return point, point * (1 - self.band), point * (1 + self.band)
+
+
+class RandomForestForecaster:
+    # The forest the Forecasting page serves: fit_forest over the
+    # features.feature_names() features, rolled forward by recursive_forecast
+    # with the interval taken from the spread of the per-tree paths.
+    warm_start = False
+
+    def __init__(self, n_estimators=100, quantiles=(0.05, 0.95)):
+        self.n_estimators = n_estimators
+        self.quantiles = quantiles
+
+    def fit(self, train):
+        self.close = train.to_frame('series')
+        self.model = fit_forest(self.close, n_estimators=self.n_estimators, n_jobs=1)
+
+    def forecast(self, steps):
+        result = recursive_forecast(self.model, self.close, steps=steps, quantiles=self.quantiles)
+        return tuple(result[name]['series'].to_numpy() for name in ('forecast', 'lower', 'upper'))
+
+
+class ServedModelForecaster:
+    # A batch_forecast.MODELS entry, fitted on each fold the way the
+    # Forecasting page and precompute run it; the interval is its conf_int.
+    # These fit and forecast in one call, so their fit counts as predict_time.
+    warm_start = False
+    model = None
+
+    def __init__(self):
+        self.cache = ForecastCache(None, max_items=1)
+
+    def fit(self, train):
+        self.train = train
+
+    def forecast(self, steps):
+        forecast, conf_int = MODELS[self.model](self.cache, None, None, self.train, steps)
+        point = np.asarray(forecast, dtype=float)
+        half = np.asarray(conf_int, dtype=float)
+        return point, point - half, point + half
+
+
+class HoltWintersBatchForecaster(ServedModelForecaster):
+    model = 'holt_winters_batch'
+
+
+class ArimaForecaster(ServedModelForecaster):
+    model = 'arima'
+
+
+FORECASTERS = {
+    'holt_winters': HoltWintersForecaster,
+    'holt_winters_batch': HoltWintersBatchForecaster,
+    'arima': ArimaForecaster,
+    'random_forest': RandomForestForecaster,
+}
+
+
+def origins(n, initial, horizon, step):
+    return list(range(initial, n - horizon + 1, step))
+
+
+def _run_folds(ticker, model_name, series, fold_origins, horizon):
+    forecaster = FORECASTERS[model_name]()
+    rows = []
+    for origin in fold_origins:
+        train = series.iloc[:origin]
+        actual = series.iloc[origin:origin + horizon].to_numpy(dtype=float)
+        start = time.perf_counter()
+        forecaster.fit(train)
+        fit_time = time.perf_counter() - start
+        start = time.perf_counter()
+        point, lower, upper = forecaster.forecast(horizon)
+        predict_time = time.perf_counter() - start
+        error = actual - point
+        rows.append({
+            'ticker': ticker,
+            'model': model_name,
+            'origin': series.index[origin - 1],
+            'mae': np.mean(np.abs(error)),
+            'mape': np.mean(np.abs(error / actual)) * 100,
+            'coverage': np.mean((actual >= lower) & (actual <= upper)),
+            'fit_time': fit_time,
+            'predict_time': predict_time,
+        })
+    return rows
+
+
+def _chunks(items, n):
+    n = max(1, min(n, len(items)))
+    return [items[i::n] for i in range(n)] if n > 1 else [items]
+
+
+def walk_forward(data, models=tuple(FORECASTERS), feature='Close', initial=252, horizon=20,
+                 step=20, max_workers=None, executor=None):
+    # Rolling-origin evaluation: each fold trains on every bar before the
+    # origin and scores the next `horizon` bars. Warm-startable models run
+    # their folds in order in one task so state carries over; the others
+    # are split across workers fold by fold.
+    max_workers = max_workers or os.cpu_count() or 1
+    tasks = []
+    for ticker, df in data.items():
+        series = df[feature].dropna()
+        fold_origins = origins(len(series), initial, horizon, step)
+        if not fold_origins:
+            continue
+        for model_name in models:
+            if FORECASTERS[model_name].warm_start:
+                tasks.append((ticker, model_name, series, fold_origins, horizon))
+            else:
+                for chunk in _chunks(fold_origins, max_workers):
+                    tasks.append((ticker, model_name, series, sorted(chunk), horizon))
+
+    owns_executor = executor is None
+    if owns_executor:
+        executor = ProcessPoolExecutor(max_workers=max_workers)
+    rows, errors = [], {}
+    try:
+        futures = {executor.submit(_run_folds, *task): task for task in tasks}
+        for future in as_completed(futures):
+            ticker, model_name = futures[future][:2]
+            try:
+                rows.extend(future.result())
+            except Exception as e:
+                errors[f"{ticker}:{model_name}"] = str(e) or type(e).__name__
+    finally:
+        if owns_executor:
+            executor.shutdown()
+
+    folds = pd.DataFrame(rows)
+    if not folds.empty:
+        folds = folds.sort_values(['ticker', 'model', 'origin']).reset_index(drop=True)
+    return folds, errors
+
+
+def summarize(folds):
+    if folds.empty:
+        return folds
+    return folds.groupby('model').agg(
+        folds=('mae', 'size'),
+        mae=('mae', 'mean'),
+        mape=('mape', 'mean'),
+        coverage=('coverage', 'mean'),
+        fit_time=('fit_time', 'mean'),
+        predict_time=('predict_time', 'mean'),
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Walk-forward backtest of the forecasters.")
+    parser.add_argument('--tickers', required=True, help="Comma separated tickers, or @file with one per line")
+    parser.add_argument('--period', default='2y')
+    parser.add_argument('--feature', default='Close')
+    parser.add_argument('--models', default=','.join(FORECASTERS))
+    parser.add_argument('--initial', type=int, default=252)
+    parser.add_argument('--horizon', type=int, default=20)
+    parser.add_argument('--step', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--out', help="Write per-fold results to this CSV")
+    args = parser.parse_args(argv)
+
+    from price_store import PriceStore
+
+    data, errors = PriceStore().get(parse_tickers(args.tickers), period=args.period)
+    folds, fold_errors = walk_forward(data, models=args.models.split(','), feature=args.feature,
+                                      initial=args.initial, horizon=args.horizon, step=args.step,
+                                      max_workers=args.workers)
+    errors.update(fold_errors)
+    for name, error in errors.items():
+        print(f"{name}: {error}", file=sys.stderr)
+    if args.out:
+        folds.to_csv(args.out, index=False)
+    print(summarize(folds).to_string())
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,321 @@
+import argparse
+import os
+import sys
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from forecast_cache import DEFAULT_DIR, ForecastCache, fingerprint
+from holt_winters import forecast_incremental
+from holt_winters_batch import forecast_many
+from metrics import METRICS
+
+
+FEATURES = ['Open', 'High', 'Low', 'Close']
+
+
+def holt_winters_params(steps, seasonal_periods=20):
+    return dict(model='holt_winters', trend='add', seasonal='add', seasonal_periods=seasonal_periods, steps=steps)
+
+
+def forecast_holt_winters(cache, ticker, feature, series, steps=40, seasonal_periods=20):
+    params = holt_winters_params(steps, seasonal_periods)
+
+    def fit():
+        forecast = forecast_incremental(cache, f"{ticker}:{feature}", series, steps,
+                                        seasonal_periods=seasonal_periods)
+        conf_int = 0.02 * forecast
+        return forecast, conf_int
+
+    return cache.get_or_compute(fingerprint(series, params), fit)
+
+
+def holt_winters_batch_params(steps, seasonal_periods=20):
+    return dict(model='holt_winters_batch', trend='add', seasonal='add', seasonal_periods=seasonal_periods,
+                steps=steps)
+
+
+def holt_winters_many(series_list, steps=40, seasonal_periods=20):
+    # One BatchHoltWinters fit over all series; [(forecast, conf_int), ...],
+    # with a ValueError in place of each series shorter than two seasons.
+    with METRICS.timer('holt_winters_batch_fit'):
+        forecasts, model = forecast_many(series_list, steps, seasonal_periods)
+    return [
+        (forecast, 0.02 * forecast) if valid
+        else ValueError(f"Need at least {2 * seasonal_periods} bars to fit, got {length}")
+        for forecast, valid, length in zip(forecasts, model.valid, model.lengths)
+    ]
+
+
+def forecast_holt_winters_batch(cache, ticker, feature, series, steps=40, seasonal_periods=20):
+    params = holt_winters_batch_params(steps, seasonal_periods)
+
+    def fit():
+        value = holt_winters_many([series], steps, seasonal_periods)[0]
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+    return cache.get_or_compute(fingerprint(series, params), fit)
+
+
+def arima_params(steps, p=1, q=1):
+    return dict(model='arima', p=p, d='adf', q=q, steps=steps)
+
+
+def differencing_order(series, max_d=2, alpha=0.05):
+    # Smallest d for which the augmented Dickey-Fuller test rejects a unit
+    # root in the d-times differenced series.
+    from statsmodels.tsa.stattools import adfuller
+
+    values = np.asarray(series, dtype=float)
+    for d in range(max_d):
+        with warnings.catch_warnings():
+            # Newer statsmodels warn about the tuple return; [1] is the
+            # p-value either way.
+            warnings.simplefilter('ignore', FutureWarning)
+            p_value = adfuller(values, autolag='AIC')[1]
+        if p_value < alpha:
+            return d
+        values = np.diff(values)
+    return max_d
+
+
+def forecast_arima(cache, ticker, feature, series, steps=40, p=1, q=1):
+    params = arima_params(steps, p, q)
+
+    def fit():
+        from statsmodels.tsa.arima.model import ARIMA
+
+        order = (p, differencing_order(series), q)
+        with METRICS.timer('arima_fit', ticker):
+            model_fit = ARIMA(series.to_numpy(dtype=float), order=order).fit()
+        result = model_fit.get_forecast(steps=steps)
+        lower, upper = result.conf_int(alpha=0.05).T
+        forecast = pd.Series(result.predicted_mean)
+        conf_int = pd.Series((upper - lower) / 2)
+        return forecast, conf_int
+
+    return cache.get_or_compute(fingerprint(series, params), fit)
+
+
+MODELS = {
+    'holt_winters': forecast_holt_winters,
+    'holt_winters_batch': forecast_holt_winters_batch,
+    'arima': forecast_arima,
+}
+
+MODEL_PARAMS = {
+    'holt_winters': holt_winters_params,
+    'holt_winters_batch': holt_winters_batch_params,
+    'arima': arima_params,
+}
+
+MODEL_NAMES = {
+    'holt_winters': 'Holt-Winters',
+    'holt_winters_batch': 'Holt-Winters (batch)',
+    'arima': 'ARIMA',
+}
+
+# Models fitted for all pending jobs at once in the calling process rather
+# than one job per pool worker.
+BATCHED = {
+    'holt_winters_batch': holt_winters_many,
+}
+
+
+def job_key(job):
+    return fingerprint(job.series, MODEL_PARAMS[job.model](job.steps))
+
+
+class ForecastJob:
+    def __init__(self, ticker, feature, model, series, steps):
+        self.ticker = ticker
+        self.feature = feature
+        self.model = model
+        self.series = series
+        self.steps = steps
+
+
+class ForecastResult:
+    def __init__(self, job, forecast=None, conf_int=None, error=None, elapsed=0.0):
+        self.ticker = job.ticker
+        self.feature = job.feature
+        self.model = job.model
+        self.forecast = forecast
+        self.conf_int = conf_int
+        self.error = error
+        self.elapsed = elapsed
+
+
+_worker_caches = {}
+
+
+def _run_job(job, cache_dir):
+    # Runs in a worker process; each worker keeps its own cache instance and
+    # shares results and incremental state with the others through disk.
+    cache = _worker_caches.get(cache_dir)
+    if cache is None:
+        cache = _worker_caches[cache_dir] = ForecastCache(cache_dir, max_items=32)
+    start = time.perf_counter()
+    try:
+        forecast, conf_int = MODELS[job.model](cache, job.ticker, job.feature, job.series, job.steps)
+    except Exception as e:
+        return ForecastResult(job, error=str(e) or type(e).__name__, elapsed=time.perf_counter() - start)
+    return ForecastResult(job, forecast, conf_int, elapsed=time.perf_counter() - start)
+
+
+def make_jobs(data, features=FEATURES, models=('holt_winters',), steps=40, min_length=10):
+    jobs = []
+    for ticker, df in data.items():
+        for feature in features:
+            series = df[feature].dropna()
+            if len(series) <= min_length:
+                continue
+            for model in models:
+                jobs.append(ForecastJob(ticker, feature, model, series, steps))
+    return jobs
+
+
+def _run_batched(jobs, cache):
+    # Fits jobs of a BATCHED model together, grouped by model and horizon,
+    # and publishes each result to the cache and to its flight's waiters.
+    groups = {}
+    for job in jobs:
+        groups.setdefault((job.model, job.steps), []).append(job)
+    results = []
+    for (model, steps), group in groups.items():
+        start = time.perf_counter()
+        try:
+            values = BATCHED[model]([job.series for job in group], steps)
+        except Exception as e:
+            values = [e] * len(group)
+        elapsed = (time.perf_counter() - start) / len(group)
+        for job, value in zip(group, values):
+            if isinstance(value, Exception):
+                result = ForecastResult(job, error=str(value) or type(value).__name__, elapsed=elapsed)
+            else:
+                cache.set(job_key(job), value)
+                result = ForecastResult(job, *value, elapsed=elapsed)
+            METRICS.observe(f"forecast_{model}", elapsed, job.ticker)
+            cache.flights.resolve(job_key(job), result)
+            results.append(result)
+    return results
+
+
+def iter_forecasts(jobs, cache=None, executor=None, max_workers=None, cache_dir=DEFAULT_DIR):
+    # Yields a ForecastResult per job as soon as it is available: exact cache
+    # hits and BATCHED models (fitted together, in this process) first, then
+    # fits from the process pool in completion order. A job another caller of the same
+    # cache already has in flight is not refitted; its result is shared.
+    # Pool workers persist into the directory of `cache`; `cache_dir` only
+    # applies when no cache is given.
+    cache = cache or ForecastCache(cache_dir)
+    cache_dir = cache.cache_dir
+    hits, pooled, batched, waiting = [], [], [], {}
+    for job in jobs:
+        key = job_key(job)
+        hit = cache.get(key)
+        METRICS.cache('forecast_job', hit is not None)
+        if hit is not None:
+            hits.append(ForecastResult(job, *hit))
+            continue
+        flight, owner = cache.flights.claim(key)
+        if not owner:
+            waiting[flight] = job
+        elif job.model in BATCHED:
+            batched.append(job)
+        else:
+            pooled.append(job)
+
+    def finish(job, future):
+        # Runs when the worker is done, even if this generator is abandoned
+        # mid-way by a rerun, so waiters on the flight are always released.
+        key = job_key(job)
+        try:
+            result = future.result()
+        except BaseException as e:
+            cache.flights.resolve(key, error=e)
+            return
+        # Fit time as measured in the worker, whose own METRICS is not
+        # visible from here.
+        METRICS.observe(f"forecast_{result.model}", result.elapsed, result.ticker)
+        if result.error is None:
+            # The worker already wrote the disk tier; only warm memory here.
+            cache.set(key, (result.forecast, result.conf_int), persist=False)
+        cache.flights.resolve(key, result)
+
+    owns_executor = executor is None and pooled
+    if owns_executor:
+        executor = ProcessPoolExecutor(max_workers=max_workers)
+    futures = dict(waiting)
+    try:
+        for i, job in enumerate(pooled):
+            try:
+                future = executor.submit(_run_job, job, cache_dir)
+            except BaseException as e:
+                for job in pooled[i:]:
+                    cache.flights.resolve(job_key(job), error=e)
+                raise
+            future.add_done_callback(lambda f, job=job: finish(job, f))
+            futures[future] = job
+
+        # The batched fit runs before anything is yielded, so a caller that
+        # stops early cannot leave its flights unsettled.
+        yield from hits + _run_batched(batched, cache)
+
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                yield ForecastResult(job, error=str(e) or type(e).__name__)
+                continue
+            yield ForecastResult(job, result.forecast, result.conf_int, result.error, result.elapsed)
+    finally:
+        if owns_executor:
+            executor.shutdown()
+
+
+def parse_tickers(arg):
+    if arg.startswith('@'):
+        with open(arg[1:]) as f:
+            return [line.strip().upper() for line in f if line.strip()]
+    return [t.strip().upper() for t in arg.split(',') if t.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute forecasts for a universe of tickers.")
+    parser.add_argument('--tickers', required=True, help="Comma separated tickers, or @file with one per line")
+    parser.add_argument('--period', default='1y')
+    parser.add_argument('--steps', type=int, default=40)
+    parser.add_argument('--features', default=','.join(FEATURES))
+    parser.add_argument('--models', default='holt_winters', help=f"Comma separated, from: {', '.join(MODELS)}")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args(argv)
+
+    from price_store import PriceStore
+
+    tickers = parse_tickers(args.tickers)
+    data, errors = PriceStore().get(tickers, period=args.period)
+    for ticker, error in errors.items():
+        print(f"{ticker}: fetch failed: {error}", file=sys.stderr)
+
+    jobs = make_jobs(data, features=args.features.split(','), models=args.models.split(','), steps=args.steps)
+    start = time.perf_counter()
+    failed = 0
+    for result in iter_forecasts(jobs, max_workers=args.workers):
+        if result.error:
+            failed += 1
+            print(f"{result.ticker} {result.feature} {result.model}: failed: {result.error}", file=sys.stderr)
+        else:
+            print(f"{result.ticker} {result.feature} {result.model}: {result.elapsed:.2f}s")
+    print(f"{len(jobs)} jobs, {failed} failed, {time.perf_counter() - start:.1f}s total")
+    return 1 if failed or errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,62 @@
+import argparse
+import time
+
+import plotly.graph_objects as go
+
+from downsample import MAX_POINTS, decimate, resample_ohlc
+from providers import SyntheticProvider
+
+
+def candlestick(bars):
+    fig = go.Figure()
+    fig.add_trace(go.Candlestick(x=bars.index, open=bars['Open'], high=bars['High'],
+                                 low=bars['Low'], close=bars['Close'], name='Candlestick'))
+    fig.add_trace(go.Bar(x=bars.index, y=bars['Volume'], name='Volume', yaxis='y2'))
+    return fig
+
+
+def line(open_line, close_line):
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=open_line.index, y=open_line, mode='lines', name='Harga Pembuka'))
+    fig.add_trace(go.Scatter(x=close_line.index, y=close_line, mode='lines', name='Harga Penutup'))
+    return fig
+
+
+def measure(build, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        payload = build().to_json()
+        best = min(best, time.perf_counter() - start)
+    return len(payload), best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Chart payload size and build time with and without downsampling.")
+    parser.add_argument('--years', type=int, nargs='+', default=[1, 10, 30])
+    parser.add_argument('--max-points', type=int, default=MAX_POINTS)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print(f"{'history':>8} {'chart':>12} {'bars':>7} {'raw KB':>9} {'raw ms':>8} {'ds KB':>8} {'ds ms':>8}")
+    for years in args.years:
+        df = SyntheticProvider(days=252 * years).history('BENCH', period=f"{years + 1}y")
+        cases = {
+            'candlestick': (
+                lambda: candlestick(df),
+                lambda: candlestick(resample_ohlc(df, args.max_points)),
+            ),
+            'line': (
+                lambda: line(df['Open'], df['Close']),
+                lambda: line(decimate(df['Open'], args.max_points), decimate(df['Close'], args.max_points)),
+            ),
+        }
+        for name, (raw, downsampled) in cases.items():
+            raw_size, raw_time = measure(raw, args.repeat)
+            ds_size, ds_time = measure(downsampled, args.repeat)
+            print(f"{years:>7}y {name:>12} {len(df):>7} {raw_size / 1024:>9.0f} {raw_time * 1000:>8.1f} "
+                  f"{ds_size / 1024:>8.0f} {ds_time * 1000:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+import argparse
+import sys
+import time
+import warnings
+
+import numpy as np
+from statsmodels.tsa.holtwinters import ExponentialSmoothing
+
+from batch_forecast import FEATURES
+from holt_winters_batch import forecast_many, recursions
+from providers import SyntheticProvider
+
+
+def statsmodels_fit(series, seasonal_periods):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        return ExponentialSmoothing(np.asarray(series, dtype=float), trend='add', seasonal='add',
+                                    seasonal_periods=seasonal_periods).fit()
+
+
+def kernel_error(model_fit, series):
+    # Runs the batched recursions with statsmodels' own fitted parameters and
+    # initial states; the one-step fitted values must agree to rounding.
+    params = model_fit.params
+    fitted = recursions(
+        np.asarray(series, dtype=float)[:, None],
+        params['smoothing_level'], params['smoothing_trend'], params['smoothing_seasonal'],
+        np.array([params['initial_level']]), np.array([params['initial_trend']]),
+        np.asarray(params['initial_seasons'])[:, None], fitted=True,
+    )[4][:, 0]
+    return np.max(np.abs(fitted - model_fit.fittedvalues) / np.abs(model_fit.fittedvalues))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batched NumPy Holt-Winters against statsmodels, one series at a time.")
+    parser.add_argument('--tickers', type=int, default=500)
+    parser.add_argument('--days', type=int, default=252, help="Bars per series")
+    parser.add_argument('--steps', type=int, default=40)
+    parser.add_argument('--seasonal-periods', type=int, default=20)
+    parser.add_argument('--compare', type=int, default=50, help="Series also fitted with statsmodels")
+    parser.add_argument('--tolerance', type=float, default=0.05,
+                        help="Largest median relative forecast gap to statsmodels accepted")
+    args = parser.parse_args(argv)
+
+    provider = SyntheticProvider(days=args.days)
+    series = [
+        provider.history(f"T{i:03d}", period='max')[feature]
+        for i in range(args.tickers) for feature in FEATURES
+    ]
+
+    start = time.perf_counter()
+    forecasts, model = forecast_many(series, args.steps, args.seasonal_periods)
+    batch_time = time.perf_counter() - start
+    print(f"batch: {len(series)} series x {args.days} bars in {batch_time:.2f}s")
+
+    sample = np.random.default_rng(0).choice(len(series), min(args.compare, len(series)), replace=False)
+    gaps, sse_ratios, kernel = [], [], []
+    start = time.perf_counter()
+    for i in sample:
+        model_fit = statsmodels_fit(series[i], args.seasonal_periods)
+        reference = model_fit.forecast(args.steps)
+        gaps.append(np.max(np.abs(forecasts[i].to_numpy() / reference - 1)))
+        sse_ratios.append(model.sse[i] / model_fit.sse)
+        kernel.append(kernel_error(model_fit, series[i]))
+    per_series = (time.perf_counter() - start) / len(sample)
+    print(f"statsmodels: {per_series * 1000:.0f} ms per series, "
+          f"~{per_series * len(series):.0f}s for all {len(series)} ({per_series * len(series) / batch_time:.0f}x)")
+    print(f"kernel: max relative gap to statsmodels fitted values {max(kernel):.2e}")
+    print(f"fit: SSE / statsmodels SSE median {np.median(sse_ratios):.3f}, max {max(sse_ratios):.3f}")
+    print(f"forecast: max relative gap per series median {np.median(gaps):.4f}, "
+          f"p95 {np.percentile(gaps, 95):.4f}, max {max(gaps):.4f}")
+    return 0 if max(kernel) < 1e-8 and np.median(gaps) < args.tolerance else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
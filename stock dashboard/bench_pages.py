@@ -0,0 +1,268 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from bench_startup import copy_tree
+
+
+SCENARIOS = ['dashboard', 'forecast_batch', 'forecasting_page', 'forest']
+SIZED = {'dashboard', 'forecast_batch', 'forest'}
+# Scenarios that open one AppTest per session; the others ignore --sessions.
+MULTI_SESSION = {'dashboard', 'forecasting_page'}
+METRICS_COMPARED = ['cold_s', 'warm_s', 'cpu_s', 'peak_rss_mb', 'py_peak_mb']
+# Committed reference run; compared against by default when present.
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_baseline.json')
+# Differences below these are noise whatever the relative change.
+FLOORS = {'cold_s': 0.1, 'warm_s': 0.1, 'cpu_s': 0.25, 'peak_rss_mb': 10, 'py_peak_mb': 5}
+
+
+def synthetic_tickers(n):
+    return [f"T{i:03d}" for i in range(n)]
+
+
+def page_test(page, func, timeout):
+    from streamlit.testing.v1 import AppTest
+
+    return AppTest.from_string(f"from {page} import {func}\n{func}()", default_timeout=timeout)
+
+
+def _check(at):
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    return at
+
+
+def dashboard(size, sessions, timeout):
+    # One AppTest per session. The first run (default tickers) only warms
+    # imports; `cold` is the first render of the `size` synthetic tickers,
+    # `warm` a rerun with everything cached.
+    tests = [_check(page_test('Dashboard', 'show_dashboard', timeout).run()) for _ in range(sessions)]
+    tickers = ', '.join(synthetic_tickers(size))
+
+    def cold(at):
+        at.sidebar.text_area[0].set_value(tickers)
+        _check(at.run())
+
+    def warm(at):
+        _check(at.run())
+
+    return lambda: _concurrently(cold, tests), lambda: _concurrently(warm, tests)
+
+
+def _concurrently(step, tests):
+    if len(tests) == 1:
+        return step(tests[0])
+    errors = []
+
+    def run(at):
+        try:
+            step(at)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(at,)) for at in tests]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    if errors:
+        raise errors[0]
+
+
+def forecast_batch(size, sessions, timeout):
+    # The stockapp forecast_page flow without the UI: every feature of every
+    # ticker through the process pool, then again from the cache.
+    from batch_forecast import FEATURES, iter_forecasts, make_jobs
+    from forecast_cache import ForecastCache
+    from price_store import open_store
+
+    cache_dir = tempfile.mkdtemp(prefix='forecasts-')
+    cache = ForecastCache(cache_dir)
+    store = open_store()
+
+    def run():
+        data, _ = store.get(synthetic_tickers(size), period="1y")
+        jobs = make_jobs(data, features=FEATURES, steps=40)
+        failed = [r for r in iter_forecasts(jobs, cache=cache, cache_dir=cache_dir) if r.error]
+        if failed:
+            raise RuntimeError(f"{failed[0].ticker} {failed[0].feature}: {failed[0].error}")
+
+    return run, run
+
+
+def forecasting_page(size, sessions, timeout):
+    tests = [page_test('Forecasting', 'show_forecasting', timeout) for _ in range(sessions)]
+    step = lambda: _concurrently(lambda at: _check(at.run()), tests)
+    return step, step
+
+
+def forest(size, sessions, timeout):
+    # Training and recursive forecasting of one forest over a `size`-ticker
+    # panel, as model_registry and the Forecasting page do per ticker.
+    import pandas as pd
+
+    from ml_forecast import fit_forest, recursive_forecast
+    from price_store import open_store
+
+    data, _ = open_store().get(synthetic_tickers(size), period="2y")
+    close = pd.DataFrame({ticker: df['Close'] for ticker, df in data.items()})
+    model = fit_forest(close, n_estimators=50, random_state=0)
+
+    def cold():
+        recursive_forecast(fit_forest(close, n_estimators=50, random_state=0), close, steps=20)
+
+    def warm():
+        recursive_forecast(model, close, steps=20)
+
+    return cold, warm
+
+
+def _cpu():
+    self_, children = resource.getrusage(resource.RUSAGE_SELF), resource.getrusage(resource.RUSAGE_CHILDREN)
+    return self_.ru_utime + self_.ru_stime + children.ru_utime + children.ru_stime
+
+
+def measure(scenario, size, sessions, repeat, timeout):
+    # Runs inside the child process. Latency and CPU come from untraced
+    # runs; tracemalloc is only switched on for one extra warm run.
+    cold, warm = globals()[scenario](size, sessions, timeout)
+    cpu = _cpu()
+    start = time.perf_counter()
+    cold()
+    cold_s = time.perf_counter() - start
+    warm_times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        warm()
+        warm_times.append(time.perf_counter() - start)
+    cpu_s = _cpu() - cpu
+
+    tracemalloc.start()
+    warm()
+    py_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return dict(
+        cold_s=cold_s,
+        warm_s=statistics.median(warm_times),
+        cpu_s=cpu_s,
+        peak_rss_mb=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        py_peak_mb=py_peak / 2 ** 20,
+    )
+
+
+def run_scenario(scenario, size, sessions, repeat, timeout):
+    # Each scenario gets a fresh process and a throwaway copy of the sources,
+    # so caches, stores and registries start empty and peak RSS is its own.
+    with tempfile.TemporaryDirectory() as cwd:
+        copy_tree(cwd)
+        env = dict(os.environ, STOCK_PROVIDER='synthetic', STOCK_LIVE_FEED='fake', PYTHONPATH=cwd)
+        cmd = [sys.executable, os.path.join(cwd, 'bench_pages.py'), '--child', scenario,
+               '--sizes', str(size), '--sessions', str(sessions), '--repeat', str(repeat),
+               '--timeout', str(timeout)]
+        proc = subprocess.run(cmd, cwd=cwd, env=env, capture_output=True, text=True)
+    if proc.returncode:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "failed")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def machine_info():
+    cpu = platform.processor()
+    try:
+        with open('/proc/cpuinfo') as f:
+            cpu = next((line.split(':', 1)[1].strip() for line in f if line.startswith('model name')), cpu)
+    except OSError:
+        pass
+    try:
+        memory_gb = round(os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') / 2 ** 30, 1)
+    except (ValueError, OSError, AttributeError):
+        memory_gb = None
+    return dict(cpu=cpu, cpus=os.cpu_count(), memory_gb=memory_gb, platform=platform.platform(),
+                python=platform.python_version())
+
+
+def scenario_id(scenario, size, sessions):
+    return f"{scenario}[tickers={size},sessions={sessions}]"
+
+
+def regressions(results, baseline, tolerance):
+    flagged = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if not base or 'error' in result:
+            continue
+        for metric in METRICS_COMPARED:
+            old, new = base.get(metric), result.get(metric)
+            if old is None or new is None:
+                continue
+            if new > old * (1 + tolerance) and new - old > FLOORS[metric]:
+                flagged.append((key, metric, old, new))
+    return flagged
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline latency, memory and CPU benchmarks of the pages.")
+    parser.add_argument('--scenarios', nargs='+', default=SCENARIOS, choices=SCENARIOS)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[5, 50, 500], help="Ticker counts")
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 4], help="Concurrent sessions")
+    parser.add_argument('--repeat', type=int, default=3, help="Warm reruns per scenario")
+    parser.add_argument('--timeout', type=float, default=600)
+    parser.add_argument('--baseline', default=BASELINE if os.path.exists(BASELINE) else None,
+                        help="Baseline JSON to compare against (default: the committed bench_baseline.json)")
+    parser.add_argument('--save-baseline', help="Write this run's results as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed relative slowdown")
+    parser.add_argument('--child', choices=SCENARIOS, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(measure(args.child, args.sizes[0], args.sessions[0], args.repeat, args.timeout)))
+        return 0
+
+    results = {}
+    print(f"{'scenario':<48} {'cold s':>8} {'warm s':>8} {'cpu s':>8} {'rss MB':>8} {'py MB':>8}")
+    for scenario in args.scenarios:
+        for size in (args.sizes if scenario in SIZED else [1]):
+            for sessions in (args.sessions if scenario in MULTI_SESSION else [1]):
+                key = scenario_id(scenario, size, sessions)
+                try:
+                    result = run_scenario(scenario, size, sessions, args.repeat, args.timeout)
+                except Exception as e:
+                    results[key] = dict(error=str(e))
+                    print(f"{key:<48} failed: {e}")
+                    continue
+                results[key] = result
+                print(f"{key:<48} {result['cold_s']:>8.2f} {result['warm_s']:>8.2f} {result['cpu_s']:>8.1f} "
+                      f"{result['peak_rss_mb']:>8.0f} {result['py_peak_mb']:>8.1f}")
+
+    machine = machine_info()
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(dict(machine=machine, results=results), f, indent=2, sort_keys=True)
+            f.write('\n')
+
+    status = 1 if any('error' in r for r in results.values()) else 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        recorded_on = baseline.get('machine', {})
+        if recorded_on.get('cpus') != machine['cpus'] or recorded_on.get('cpu') != machine['cpu']:
+            print(f"Note: baseline recorded on {recorded_on.get('cpus')} x {recorded_on.get('cpu')}, "
+                  f"this run on {machine['cpus']} x {machine['cpu']}; differences may be the machine's.")
+        flagged = regressions(results, baseline.get('results', {}), args.tolerance)
+        for key, metric, old, new in flagged:
+            print(f"REGRESSION {key} {metric}: {old:.2f} -> {new:.2f} (+{(new / old - 1) * 100:.0f}%)")
+        if flagged:
+            status = 1
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
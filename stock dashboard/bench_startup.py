@@ -0,0 +1,160 @@
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+PAGES = {
+    'Dashboard': 'show_dashboard',
+    'Forecasting': 'show_forecasting',
+}
+
+# The scripts `streamlit run` starts; measured as one cold process that
+# renders the script's first page under -X importtime.
+ENTRY_POINTS = ('App.py', 'stockapp.py')
+
+MARKER = '-- first render --'
+
+RENDER = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+ready = time.perf_counter()
+at = AppTest.from_string("from {page} import {func}\\n{func}()", default_timeout={timeout}).run()
+done = time.perf_counter()
+print(json.dumps(dict(streamlit=ready - start, render=done - ready,
+                      errors=[str(e.value) for e in at.exception])))
+"""
+
+RENDER_FILE = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+ready = time.perf_counter()
+print({marker!r}, file=sys.stderr, flush=True)
+at = AppTest.from_file({path!r}, default_timeout={timeout}).run()
+done = time.perf_counter()
+print(json.dumps(dict(streamlit=ready - start, render=done - ready,
+                      errors=[str(e.value) for e in at.exception])))
+"""
+
+
+def copy_tree(target):
+    # Pages write their stores and caches next to the sources, so every run
+    # works on a throwaway copy: a cold start with no data/ directory.
+    for name in os.listdir(HERE):
+        if name.endswith('.py'):
+            shutil.copy(os.path.join(HERE, name), target)
+    subprocess.run([sys.executable, '-m', 'compileall', '-q', target], check=True)
+
+
+def run(code, cwd, importtime=False):
+    env = dict(os.environ, STOCK_PROVIDER='synthetic', STOCK_LIVE_FEED='fake', PYTHONPATH=cwd)
+    cmd = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', code]
+    start = time.perf_counter()
+    proc = subprocess.run(cmd, cwd=cwd, env=env, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if proc.returncode:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    return elapsed, proc
+
+
+def parse_importtime(stderr, module):
+    # `-X importtime` lines are "import time: self [us] | cumulative | name",
+    # children indented two spaces under, and printed before, their parent.
+    # Returns the total for `module` and the cumulative seconds of each of
+    # its direct imports.
+    children = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        seconds = int(cumulative) / 1e6
+        if depth == 1:
+            children[name.strip()] = seconds
+        elif depth == 0:
+            if name.strip() == module:
+                return seconds, children
+            children = {}
+    return 0.0, children
+
+
+def parse_script_imports(stderr, marker=MARKER):
+    # Cumulative seconds of each top-level import made after `marker`, that
+    # is while AppTest ran the script, and their total.
+    imports = {}
+    started = False
+    for line in stderr.splitlines():
+        if line == marker:
+            started = True
+        elif started and line.startswith('import time:') and 'cumulative' not in line:
+            _, cumulative, name = line[len('import time:'):].split('|')
+            if len(name) - len(name.lstrip()) == 1:
+                imports[name.strip()] = int(cumulative) / 1e6
+    return sum(imports.values()), imports
+
+
+def import_profile(page, cwd):
+    elapsed, proc = run(f"import {page}", cwd, importtime=True)
+    return (elapsed, *parse_importtime(proc.stderr, page))
+
+
+def first_render(page, cwd, timeout):
+    elapsed, proc = run(RENDER.format(page=page, func=PAGES[page], timeout=timeout), cwd)
+    return dict(json.loads(proc.stdout.strip().splitlines()[-1]), total=elapsed)
+
+
+def entry_point(script, cwd, timeout):
+    # First render of a whole entry script, imports included; import times
+    # come from the same run, so the render is slightly slowed by tracing.
+    code = RENDER_FILE.format(marker=MARKER, path=os.path.join(cwd, script), timeout=timeout)
+    elapsed, proc = run(code, cwd, importtime=True)
+    render = dict(json.loads(proc.stdout.strip().splitlines()[-1]), total=elapsed)
+    import_total, imports = parse_script_imports(proc.stderr)
+    return elapsed, import_total, imports, render
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cold-start import time and first render time per page "
+                                                 "and entry point.")
+    targets = list(ENTRY_POINTS) + list(PAGES)
+    parser.add_argument('--pages', nargs='+', default=targets, choices=targets)
+    parser.add_argument('--top', type=int, default=8, help="Slowest top-level imports to list")
+    parser.add_argument('--timeout', type=float, default=300)
+    parser.add_argument('--json', help="Also write the results to this file")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for page in args.pages:
+        with tempfile.TemporaryDirectory() as cwd:
+            copy_tree(cwd)
+            if page in ENTRY_POINTS:
+                import_wall, import_total, imports, render = entry_point(page, cwd, args.timeout)
+            else:
+                import_wall, import_total, imports = import_profile(page, cwd)
+                render = first_render(page, cwd, args.timeout)
+        results[page] = dict(import_wall=import_wall, import_total=import_total, imports=imports, **render)
+
+        print(f"{page}: import {import_total * 1000:.0f} ms ({import_wall * 1000:.0f} ms process wall), "
+              f"first render {render['total'] * 1000:.0f} ms "
+              f"(streamlit {render['streamlit'] * 1000:.0f} ms, page {render['render'] * 1000:.0f} ms)")
+        for name, seconds in sorted(imports.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"    {seconds * 1000:>8.1f} ms  {name}")
+        for error in render['errors']:
+            print(f"    error: {error}", file=sys.stderr)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 1 if any(r['errors'] for r in results.values()) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,127 @@
+import copy
+import threading
+from collections import OrderedDict
+
+import plotly.graph_objects as go
+
+from downsample import MAX_POINTS, decimate, resample_ohlc
+from metrics import METRICS
+
+
+CANDLESTICK = 'Candlestick dengan Volume'
+LINE = 'Line Plot'
+CHART_TYPES = (CANDLESTICK, LINE)
+
+GL_THRESHOLD = 500
+
+PLOT_CONTAINER_STYLE = """
+    <style>
+    .plot-container {
+        border: 2px solid #ffffff;
+        border-radius: 12px;
+        padding: 20px;
+        box-shadow: 0px 4px 8px rgba(0,0,0,0.2);
+        background-color: #ffffff;
+        margin-top: 20px;
+    }
+    </style>
+"""
+
+_BASE_LAYOUTS = {
+    CANDLESTICK: go.Layout(
+        xaxis_title='Tanggal',
+        yaxis_title='Harga',
+        yaxis2=dict(
+            title='Volume',
+            overlaying='y',
+            side='right'
+        ),
+        xaxis_rangeslider_visible=False
+    ),
+    LINE: go.Layout(
+        xaxis_title='Tanggal',
+        yaxis_title='Harga',
+    ),
+}
+
+
+def data_version(df):
+    # Cheap identity of a bar frame: changes whenever a bar is appended or
+    # the last bar is revised.
+    if df.empty:
+        return (0,)
+    last = df.iloc[-1]
+    return (len(df), str(df.index[0]), str(df.index[-1]), *(float(v) for v in last.to_numpy()))
+
+
+def line_trace(series, gl_threshold=GL_THRESHOLD, **kwargs):
+    trace = go.Scattergl if len(series) > gl_threshold else go.Scatter
+    return trace(x=series.index, y=series, mode='lines', **kwargs)
+
+
+def base_figure(chart_type):
+    return go.Figure(layout=copy.deepcopy(_BASE_LAYOUTS[chart_type]))
+
+
+def build_figure(chart_type, df, title=None, max_points=MAX_POINTS, gl_threshold=GL_THRESHOLD):
+    fig = base_figure(chart_type)
+    if chart_type == CANDLESTICK:
+        bars = resample_ohlc(df, max_points)
+        fig.add_trace(go.Candlestick(
+            x=bars.index,
+            open=bars['Open'],
+            high=bars['High'],
+            low=bars['Low'],
+            close=bars['Close'],
+            name='Candlestick'
+        ))
+        fig.add_trace(go.Bar(
+            x=bars.index,
+            y=bars['Volume'],
+            name='Volume',
+            yaxis='y2',
+            marker=dict(color='rgba(0, 100, 250, 0.5)')
+        ))
+    else:
+        fig.add_trace(line_trace(decimate(df['Open'], max_points), gl_threshold,
+                                 name='Harga Pembuka', line=dict(color='royalblue')))
+        fig.add_trace(line_trace(decimate(df['Close'], max_points), gl_threshold,
+                                 name='Harga Penutup', line=dict(color='firebrick')))
+    if title is not None:
+        fig.update_layout(title=title)
+    return fig
+
+
+class ChartFactory:
+    # Finished go.Figure objects are kept per (ticker, chart type, title,
+    # data version), so a rerun with unchanged bars skips trace construction.
+    # st.plotly_chart takes a Figure without re-validating it (a dict would be
+    # rebuilt and validated on every call), so the object itself is cached.
+    # Figures are shared between sessions: callers must not modify them.
+    def __init__(self, max_items=256, max_points=MAX_POINTS, gl_threshold=GL_THRESHOLD):
+        self.max_items = max_items
+        self.max_points = max_points
+        self.gl_threshold = gl_threshold
+        self.hits = 0
+        self.misses = 0
+        self._figures = OrderedDict()
+        self._lock = threading.Lock()
+
+    def figure(self, ticker, chart_type, df, title=None):
+        key = (ticker, chart_type, title, data_version(df))
+        with self._lock:
+            fig = self._figures.get(key)
+            if fig is not None:
+                self._figures.move_to_end(key)
+                self.hits += 1
+                METRICS.cache('chart', True)
+                return fig
+            self.misses += 1
+        METRICS.cache('chart', False)
+        with METRICS.timer('chart_build', ticker):
+            fig = build_figure(chart_type, df, title, self.max_points, self.gl_threshold)
+        with self._lock:
+            self._figures[key] = fig
+            while len(self._figures) > self.max_items:
+                self._figures.popitem(last=False)
+        return fig
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+
+MAX_POINTS = 1000
+
+OHLC_AGG = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+
+# Candidate bar sizes, finest first, with their approximate length.
+RULES = [
+    ('5min', pd.Timedelta(minutes=5)),
+    ('15min', pd.Timedelta(minutes=15)),
+    ('h', pd.Timedelta(hours=1)),
+    ('D', pd.Timedelta(days=1)),
+    ('W-FRI', pd.Timedelta(days=7)),
+    ('ME', pd.Timedelta(days=31)),
+    ('QE', pd.Timedelta(days=92)),
+    ('YE', pd.Timedelta(days=366)),
+]
+
+
+def resample_ohlc(df, max_points=MAX_POINTS):
+    # Coarser OHLCV bars (first/max/min/last/sum) so a candlestick trace has
+    # at most `max_points` bars; shorter frames are returned unchanged.
+    if len(df) <= max_points:
+        return df
+    target = (df.index[-1] - df.index[0]) / max_points
+    agg = {c: f for c, f in OHLC_AGG.items() if c in df.columns}
+    out = df
+    for rule, length in RULES:
+        if length < target:
+            continue
+        out = df.resample(rule).agg(agg).dropna(subset=['Close'])
+        if len(out) <= max_points:
+            break
+    return out
+
+
+def lttb(x, y, n_out):
+    # Largest-Triangle-Three-Buckets: indices of `n_out` points that keep the
+    # visual shape of the (x, y) line. First and last points are always kept.
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    # Mean of each following bucket (the last point closes the final one),
+    # computed for all buckets at once; only the argmax chain is sequential.
+    bounds = np.append(edges, n)
+    counts = np.diff(bounds)
+    avg_x = np.add.reduceat(x, edges) / counts
+    avg_y = np.add.reduceat(y, edges) / counts
+    selected = np.empty(n_out, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        xs, ys = x[lo:hi], y[lo:hi]
+        area = np.abs((x[a] - avg_x[i + 1]) * (ys - y[a]) - (x[a] - xs) * (avg_y[i + 1] - y[a]))
+        a = lo + int(area.argmax())
+        selected[i + 1] = a
+    return selected
+
+
+def decimate(series, max_points=MAX_POINTS):
+    if len(series) <= max_points:
+        return series
+    series = series.dropna()
+    x = series.index.asi8 if isinstance(series.index, pd.DatetimeIndex) else np.arange(len(series))
+    return series.iloc[lttb(x, series.to_numpy(), max_points)]
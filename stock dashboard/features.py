@@ -0,0 +1,128 @@
+import threading
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+LAGS = (1, 2, 3, 5, 10)
+WINDOWS = (5, 10, 20)
+RSI_WINDOW = 14
+
+
+def lookback(lags=LAGS, windows=WINDOWS, rsi_window=RSI_WINDOW):
+    # Bars of history needed to compute the newest row.
+    return max(max(lags), max(windows) + 1, rsi_window + 1) + 1
+
+
+def _rolling(values, window, func):
+    out = np.full(values.shape, np.nan)
+    if len(values) >= window:
+        out[window - 1:] = func(sliding_window_view(values, window, axis=0), axis=-1)
+    return out
+
+
+def _shift(values, k):
+    out = np.full(values.shape, np.nan)
+    if k < len(values):
+        out[k:] = values[:len(values) - k]
+    return out
+
+
+def feature_names(lags=LAGS, windows=WINDOWS, rsi_window=RSI_WINDOW):
+    names = [f"Lag_{k}" for k in lags] + ['Return']
+    for w in windows:
+        names += [f"Mean_{w}", f"Std_{w}"]
+    return names + [f"RSI_{rsi_window}", 'DayOfWeek', 'Month']
+
+
+def build_features(close, lags=LAGS, windows=WINDOWS, rsi_window=RSI_WINDOW):
+    # `close` is a wide (date x ticker) frame. Every feature on row t only
+    # uses closes up to t-1, so row t can be used to predict Close at t.
+    # Returns {name: (date x ticker) array}, computed for all tickers at once.
+    values = close.to_numpy(dtype=float)
+    with np.errstate(all='ignore'):
+        returns = np.full(values.shape, np.nan)
+        returns[1:] = values[1:] / values[:-1] - 1
+        delta = np.full(values.shape, np.nan)
+        delta[1:] = values[1:] - values[:-1]
+
+        known = {f"Lag_{k}": _shift(values, k) for k in lags}
+        known['Return'] = _shift(returns, 1)
+        for w in windows:
+            known[f"Mean_{w}"] = _shift(_rolling(returns, w, np.mean), 1)
+            known[f"Std_{w}"] = _shift(_rolling(returns, w, np.std), 1)
+        gains = _rolling(np.clip(delta, 0, None), rsi_window, np.mean)
+        losses = _rolling(np.clip(-delta, 0, None), rsi_window, np.mean)
+        known[f"RSI_{rsi_window}"] = _shift(100 - 100 / (1 + gains / losses), 1)
+
+    dates = pd.DatetimeIndex(close.index)
+    known['DayOfWeek'] = np.repeat(dates.dayofweek.to_numpy()[:, None], values.shape[1], axis=1).astype(float)
+    known['Month'] = np.repeat(dates.month.to_numpy()[:, None], values.shape[1], axis=1).astype(float)
+    return known
+
+
+def to_long(features, dates, tickers):
+    index = pd.MultiIndex.from_product([dates, tickers], names=['Date', 'Ticker'])
+    return pd.DataFrame({name: values.ravel() for name, values in features.items()}, index=index)
+
+
+def training_frame(close, **kwargs):
+    # (X, y) over every (date, ticker) pair with a complete feature row.
+    features = build_features(close, **kwargs)
+    X = to_long(features, close.index, close.columns)
+    y = pd.Series(close.to_numpy(dtype=float).ravel(), index=X.index, name='Close')
+    mask = X.notna().all(axis=1).to_numpy() & y.notna().to_numpy()
+    return X[mask], y[mask]
+
+
+class FeatureCache:
+    # Holds the feature arrays for a close panel. When the panel moves on by
+    # a few bars, only the new rows are computed, from a tail window of
+    # `lookback()` bars, and appended; rows that left the front of a rolling
+    # window are dropped. Kept rows keep the values computed while their
+    # history was still in the panel.
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.close = None
+        self.features = None
+        self._lock = threading.Lock()
+
+    def _overlap(self, close):
+        # Number of leading rows of the cached panel that `close` no longer
+        # has, or None when `close` does not continue the cached panel.
+        old = self.close
+        if old is None or list(old.columns) != list(close.columns) or not len(close):
+            return None
+        dropped = old.index.get_indexer([close.index[0]])[0]
+        if dropped < 0:
+            return None
+        kept = old.iloc[dropped:]
+        head = close.iloc[:len(kept)]
+        if not head.index.equals(kept.index):
+            return None
+        if not np.allclose(head.to_numpy(dtype=float), kept.to_numpy(dtype=float), equal_nan=True):
+            return None
+        return dropped
+
+    def update(self, close):
+        with self._lock:
+            dropped = self._overlap(close)
+            if dropped is not None:
+                new_rows = len(close) - (len(self.close) - dropped)
+                features = {name: values[dropped:] for name, values in self.features.items()}
+                if new_rows:
+                    tail = close.iloc[-(new_rows + lookback(**self.kwargs)):]
+                    fresh = build_features(tail, **self.kwargs)
+                    features = {
+                        name: np.concatenate([features[name], values[-new_rows:]])
+                        for name, values in fresh.items()
+                    }
+                self.features = features
+            else:
+                self.features = build_features(close, **self.kwargs)
+            self.close = close
+            return self.features
+
+    def frame(self, close):
+        return to_long(self.update(close), close.index, close.columns)
@@ -0,0 +1,110 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from metrics import METRICS
+
+
+class FetchResult:
+    def __init__(self):
+        self.data = {}
+        self.errors = {}
+        self.timings = {}
+
+    @property
+    def ok(self):
+        return not self.errors
+
+
+def _fetch_one(provider, ticker, kwargs, timeout, retries, backoff, started):
+    # Every attempt gets what is left of the ticker's `timeout` budget as its
+    # request timeout; no retry is started that could not finish in time.
+    start = started[ticker] = time.perf_counter()
+    deadline = start + timeout
+    for attempt in range(retries + 1):
+        try:
+            hist = provider.history(ticker, timeout=max(deadline - time.perf_counter(), 0.1), **kwargs)
+            if hist is None or hist.empty:
+                raise ValueError(f"No data returned for {ticker}")
+            return hist, time.perf_counter() - start
+        except Exception:
+            delay = backoff * 2 ** attempt
+            if attempt == retries or time.perf_counter() + delay >= deadline:
+                raise
+            time.sleep(delay)
+
+
+def _group_requests(requests):
+    groups = {}
+    for ticker, kwargs in requests.items():
+        key = tuple(sorted(kwargs.items()))
+        groups.setdefault(key, []).append(ticker)
+    return groups
+
+
+def fetch_many(provider, requests, max_workers=8, timeout=30, retries=2, backoff=0.5):
+    # `requests` maps ticker -> provider.history kwargs (`start` or `period`).
+    # Tickers sharing the same kwargs go through the provider's batch download
+    # when it has one; anything the batch missed is fetched concurrently with
+    # retries. Failures are reported per ticker instead of raised; `timeout`
+    # bounds each ticker on its own, so one hung request only fails that
+    # ticker.
+    result = FetchResult()
+    pending = dict(requests)
+
+    history_batch = getattr(provider, 'history_batch', None)
+    if history_batch is not None:
+        for key, tickers in _group_requests(pending).items():
+            if len(tickers) < 2:
+                continue
+            start = time.perf_counter()
+            try:
+                batch = history_batch(tickers, timeout=timeout, **dict(key))
+            except Exception:
+                continue
+            elapsed = time.perf_counter() - start
+            METRICS.observe('price_fetch_batch', elapsed)
+            for ticker, hist in batch.items():
+                if hist is not None and not hist.empty:
+                    result.data[ticker] = hist
+                    result.timings[ticker] = elapsed
+                    pending.pop(ticker, None)
+
+    if not pending:
+        return result
+
+    workers = min(max_workers, len(pending))
+    executor = ThreadPoolExecutor(max_workers=workers)
+    started = {}
+    begin = time.perf_counter()
+    futures = {}
+    for i, (ticker, kwargs) in enumerate(pending.items()):
+        future = executor.submit(_fetch_one, provider, ticker, kwargs, timeout, retries, backoff, started)
+        # Until it starts, a ticker may wait for the ones queued before it,
+        # each of which is cut off after `timeout`.
+        futures[future] = (ticker, begin + timeout * (i // workers + 1))
+
+    def deadline(future):
+        ticker, queued = futures[future]
+        return started[ticker] + timeout if ticker in started else queued
+
+    not_done = set(futures)
+    while not_done:
+        done, not_done = wait(not_done, timeout=max(min(map(deadline, not_done)) - time.perf_counter(), 0),
+                              return_when=FIRST_COMPLETED)
+        for future in done:
+            ticker = futures[future][0]
+            try:
+                result.data[ticker], result.timings[ticker] = future.result()
+                METRICS.observe('price_fetch', result.timings[ticker], ticker)
+            except Exception as e:
+                result.errors[ticker] = str(e) or type(e).__name__
+        now = time.perf_counter()
+        expired = {future for future in not_done if deadline(future) <= now}
+        for future in expired:
+            # A hung request keeps its worker thread but no longer holds up
+            # the other tickers or the page.
+            future.cancel()
+            result.errors[futures[future][0]] = f"Timed out after {timeout:.0f}s"
+        not_done -= expired
+    executor.shutdown(wait=False, cancel_futures=True)
+    return result
@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+from metrics import METRICS
+from single_flight import SingleFlight
+
+
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'forecasts')
+
+
+def fingerprint(*parts):
+    # Stable hash of the input series (values and index) plus the model
+    # configuration, used as the cache key for fitted forecasts.
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, (pd.Series, pd.DataFrame)):
+            digest.update(pd.util.hash_pandas_object(part, index=True).values.tobytes())
+            if isinstance(part, pd.DataFrame):
+                digest.update(json.dumps(list(map(str, part.columns))).encode())
+        elif isinstance(part, dict):
+            digest.update(json.dumps(part, sort_keys=True, default=str).encode())
+        else:
+            digest.update(repr(part).encode())
+        digest.update(b'\x00')
+    return digest.hexdigest()
+
+
+class ForecastCache:
+    # Two-tier cache: a bounded in-memory LRU in front of pickled results on
+    # disk, so a redraw with unchanged data and parameters skips the fit.
+    # Every new bar yields new keys, so writes periodically prune the disk
+    # tier: entries unused for `max_age` seconds go first, then the least
+    # recently used until the directory is under `max_bytes`.
+    def __init__(self, cache_dir=DEFAULT_DIR, max_items=128, max_age=7 * 24 * 3600,
+                 max_bytes=256 * 2 ** 20, prune_interval=300):
+        self.cache_dir = cache_dir
+        self.max_items = max_items
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.prune_interval = prune_interval
+        self._pruned_at = 0.0
+        self.hits = 0
+        self.misses = 0
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.flights = SingleFlight()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                METRICS.cache('forecast', True)
+                return self._memory[key]
+        if self.cache_dir is not None:
+            path = self._path(key)
+            try:
+                with open(path, 'rb') as f:
+                    value = pickle.load(f)
+                os.utime(path)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                pass
+            else:
+                self._remember(key, value)
+                with self._lock:
+                    self.hits += 1
+                METRICS.cache('forecast', True)
+                return value
+        with self._lock:
+            self.misses += 1
+        METRICS.cache('forecast', False)
+        return default
+
+    def set(self, key, value, persist=True):
+        self._remember(key, value)
+        if persist and self.cache_dir is not None:
+            path = self._path(key)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+            with self._lock:
+                due = time.time() - self._pruned_at >= self.prune_interval
+                if due:
+                    self._pruned_at = time.time()
+            if due:
+                self.prune()
+
+    def prune(self):
+        # Returns the number of files removed. Disk hits touch their file,
+        # so modification time orders entries by last use.
+        now = time.time()
+        entries, removed = [], 0
+        for entry in os.scandir(self.cache_dir):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            if now - stat.st_mtime > self.max_age:
+                removed += _remove(entry.path)
+            elif entry.name.endswith('.pkl'):
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            removed += _remove(path)
+            total -= size
+        return removed
+
+    def get_or_compute(self, key, compute):
+        # Concurrent misses on the same key share one computation.
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            def fill():
+                value = compute()
+                self.set(key, value)
+                return value
+
+            value = self.flights.do(key, fill)
+        return value
+
+    def _remember(self, key, value):
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_items:
+                self._memory.popitem(last=False)
+
+
+def _remove(path):
+    # Another process sharing the directory may have removed it already.
+    try:
+        os.remove(path)
+        return 1
+    except FileNotFoundError:
+        return 0
+
+
+_MISSING = object()
@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.holtwinters import ExponentialSmoothing
+
+from metrics import METRICS
+
+
+class IncrementalHoltWinters:
+    # Additive Holt-Winters whose level/trend/seasonal state is carried
+    # forward one bar at a time with the smoothing parameters of the last
+    # full statsmodels fit. A full refit happens every `refit_every` new bars
+    # or when recent one-step errors drift past `drift_threshold` times the
+    # in-sample residual scale.
+    def __init__(self, seasonal_periods=20, refit_every=20, drift_threshold=3.0, drift_window=5):
+        self.seasonal_periods = seasonal_periods
+        self.refit_every = refit_every
+        self.drift_threshold = drift_threshold
+        self.drift_window = drift_window
+
+    def fit(self, series):
+        model = ExponentialSmoothing(series, trend='add', seasonal='add',
+                                     seasonal_periods=self.seasonal_periods)
+        with METRICS.timer('holt_winters_fit'):
+            model_fit = model.fit()
+        self.alpha = model_fit.params['smoothing_level']
+        self.beta = model_fit.params['smoothing_trend']
+        self.gamma = model_fit.params['smoothing_seasonal']
+        self.level = float(np.asarray(model_fit.level)[-1])
+        self.trend = float(np.asarray(model_fit.trend)[-1])
+        self.season = np.asarray(model_fit.season, dtype=float)[-self.seasonal_periods:].copy()
+        self.resid_scale = float(np.sqrt(model_fit.sse / len(series)))
+        self.errors = []
+        self.bars_since_fit = 0
+        self.refits = getattr(self, 'refits', 0) + 1
+        self._remember_tail(series)
+        return self
+
+    def update(self, new_values):
+        for y in np.asarray(new_values, dtype=float):
+            s = self.season[0]
+            self.errors.append(y - (self.level + self.trend + s))
+            level = self.alpha * (y - s) + (1 - self.alpha) * (self.level + self.trend)
+            trend = self.beta * (level - self.level) + (1 - self.beta) * self.trend
+            seasonal = self.gamma * (y - self.level - self.trend) + (1 - self.gamma) * s
+            self.level, self.trend = level, trend
+            self.season = np.append(self.season[1:], seasonal)
+            self.bars_since_fit += 1
+        self.errors = self.errors[-self.drift_window:]
+        return self
+
+    def needs_refit(self):
+        if self.bars_since_fit >= self.refit_every:
+            return True
+        if len(self.errors) < self.drift_window:
+            return False
+        return np.mean(np.abs(self.errors)) > self.drift_threshold * self.resid_scale
+
+    def forecast(self, steps):
+        h = np.arange(1, steps + 1)
+        values = self.level + h * self.trend + self.season[(h - 1) % self.seasonal_periods]
+        if self.freq is not None:
+            index = pd.date_range(self.last_index, periods=steps + 1, freq=self.freq)[1:]
+        else:
+            index = pd.RangeIndex(self.nobs, self.nobs + steps)
+        return pd.Series(values, index=index)
+
+    def extends(self, series):
+        # True when `series` still ends its overlap with the fitted history in
+        # the same bars and values, followed by zero or more new bars. Bars
+        # may have dropped off the front, as they do from the store's rolling
+        # `period` window.
+        overlap = series[series.index <= self.last_index].iloc[-len(self.tail):]
+        return overlap.index.equals(self.tail.index) and np.array_equal(overlap.to_numpy(dtype=float), self.tail.to_numpy())
+
+    def advance(self, series):
+        new = series[series.index > self.last_index]
+        if len(new):
+            self.update(new.values)
+            self._remember_tail(series)
+            if self.needs_refit():
+                self.fit(series)
+        return self
+
+    def _remember_tail(self, series):
+        self.tail = series.iloc[-self.seasonal_periods:].astype(float)
+        self.last_index = series.index[-1]
+        self.nobs = len(series)
+        self.freq = getattr(series.index, 'freq', None)
+
+
+def forecast_incremental(cache, key, series, steps, seasonal_periods=20, refit_every=20):
+    # Keeps one IncrementalHoltWinters per `key` (e.g. ticker and feature) in
+    # `cache`; new bars update its state instead of refitting from scratch.
+    state_key = f"hw-state-v2-{key}-{seasonal_periods}".replace('/', '_').replace(':', '_')
+    model = cache.get(state_key)
+    if model is not None and model.extends(series):
+        model.advance(series)
+    else:
+        model = IncrementalHoltWinters(seasonal_periods, refit_every=refit_every).fit(series)
+    cache.set(state_key, model)
+    return model.forecast(steps)
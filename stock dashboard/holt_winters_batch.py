@@ -0,0 +1,175 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+
+def pad(series_list):
+    # Left-aligns 1-D series into a (time x series) array; shorter series are
+    # padded with trailing NaN, which the recursions skip.
+    lengths = np.array([len(s) for s in series_list])
+    Y = np.full((lengths.max(initial=0), len(series_list)), np.nan)
+    for i, s in enumerate(series_list):
+        Y[:len(s), i] = np.asarray(s, dtype=float)
+    return Y, lengths
+
+
+def initial_states(Y, seasonal_periods):
+    # Classic heuristic start: level = mean of the first season, trend = mean
+    # change between the first two seasons, seasonals = first-season
+    # deviations from that level. Series shorter than two seasons get NaN.
+    m = seasonal_periods
+    first, second = Y[:m], Y[m:2 * m]
+    level = first.mean(axis=0)
+    trend = (second.mean(axis=0) - level) / m if len(second) == m else np.full(Y.shape[1], np.nan)
+    season = first - level
+    return level, trend, season
+
+
+def recursions(Y, alpha, beta, gamma, level, trend, season, fitted=False):
+    # Additive Holt-Winters error-correction recursions, one step for every
+    # series at a time. Parameters and states may carry a leading candidate
+    # axis (K, N) to evaluate K parameter sets per series in the same loop.
+    # `season` is (m, ..., N) indexed by t % m. NaN observations leave the
+    # state untouched. Returns (sse, level, trend, season[, fitted]).
+    m = season.shape[0]
+    shape = np.broadcast_shapes(np.shape(alpha), np.shape(level), Y.shape[1:])
+    level = np.broadcast_to(level, shape).copy()
+    trend = np.broadcast_to(trend, shape).copy()
+    season = np.broadcast_to(season, (m,) + shape).copy()
+    sse = np.zeros(shape)
+    one_step = np.empty((len(Y),) + shape) if fitted else None
+    for t, y in enumerate(Y):
+        active = ~np.isnan(y)
+        s = season[t % m]
+        forecast = level + trend + s
+        if fitted:
+            one_step[t] = forecast
+        error = y - forecast
+        new_level = alpha * (y - s) + (1 - alpha) * (level + trend)
+        new_trend = beta * (new_level - level) + (1 - beta) * trend
+        season[t % m] = np.where(active, gamma * (y - level - trend) + (1 - gamma) * s, s)
+        level = np.where(active, new_level, level)
+        trend = np.where(active, new_trend, trend)
+        sse += np.where(active, error * error, 0.0)
+    if fitted:
+        return sse, level, trend, season, one_step
+    return sse, level, trend, season
+
+
+def least_squares_states(Y, alpha, beta, gamma, seasonal_periods, ridge=1e-8, block=256):
+    # For fixed parameters the recursions are linear in the initial state, so
+    # the one-step forecasts are the response to the data from a zero start
+    # plus a combination of the m + 2 unit-start responses on zeroed data.
+    # That combination is fitted to the observations per series by (lightly
+    # ridged, since level and seasonal means are collinear) least squares.
+    n = Y.shape[1]
+    if n > block:
+        # The unit responses are (time x m+2 x series); go in column blocks
+        # to bound memory.
+        parts = [least_squares_states(Y[:, i:i + block], alpha[i:i + block], beta[i:i + block],
+                                      gamma[i:i + block], seasonal_periods, ridge, block)
+                 for i in range(0, n, block)]
+        return (np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts]),
+                np.concatenate([p[2] for p in parts], axis=1))
+    m = seasonal_periods
+    k = m + 2
+    active = ~np.isnan(Y)
+    zero_start = recursions(Y, alpha, beta, gamma, np.zeros(n), np.zeros(n), np.zeros((m, n)), fitted=True)[4]
+    unit = np.eye(k)[:, :, None]
+    responses = recursions(np.where(active, 0.0, np.nan), alpha, beta, gamma,
+                           unit[0], unit[1], unit[2:], fitted=True)[4]
+    X = np.where(active[:, None, :], responses, 0.0).transpose(2, 0, 1)
+    r = np.where(active, Y - zero_start, 0.0).T
+    A = np.einsum('nti,ntj->nij', X, X)
+    A += ridge * np.trace(A, axis1=1, axis2=2)[:, None, None] * np.eye(k)
+    b = np.einsum('nti,nt->ni', X, r)
+    x = np.linalg.solve(A, b[:, :, None])[:, :, 0]
+    return x[:, 0], x[:, 1], x[:, 2:].T
+
+
+def _admissible(alpha, beta, gamma):
+    # Same region statsmodels fits in: 0 <= beta <= alpha, 0 <= gamma <= 1 - alpha.
+    alpha = np.clip(alpha, 0.0, 1.0)
+    beta = np.clip(beta, 0.0, alpha)
+    gamma = np.clip(gamma, 0.0, 1 - alpha)
+    return alpha, beta, gamma
+
+
+class BatchHoltWinters:
+    # Additive-trend, additive-season Holt-Winters fitted to many series at
+    # once, a NumPy counterpart of statsmodels'
+    # ExponentialSmoothing(trend='add', seasonal='add'). Smoothing parameters
+    # are fitted by SSE for all series together: a coarse grid evaluated in
+    # one batched pass, then a per-series compass search whose candidates are
+    # again evaluated in one pass per round.
+    def __init__(self, seasonal_periods=20, grid=(0.05, 0.2, 0.5, 0.8), rounds=16, step=0.1):
+        self.seasonal_periods = seasonal_periods
+        self.grid = grid
+        self.rounds = rounds
+        self.step = step
+
+    def fit(self, series_list):
+        # Parameters are searched from the heuristic start, the start is then
+        # re-estimated by least squares for those parameters, and the search
+        # is repeated once from there with a finer step.
+        Y, self.lengths = pad(series_list)
+        m = self.seasonal_periods
+        self.valid = self.lengths >= 2 * m
+        level0, trend0, season0 = initial_states(Y, m)
+
+        candidates = np.array(list(itertools.product(self.grid, repeat=3)))
+        alpha, beta, gamma = _admissible(*(candidates[:, i, None] for i in range(3)))
+        sse = recursions(Y, alpha, beta, gamma, level0, trend0, season0[:, None, :])[0]
+        sse = np.where(np.isnan(sse), np.inf, sse)
+        best = sse.argmin(axis=0)
+        params = np.stack([alpha[best, 0], beta[best, 0], gamma[best, 0]])
+
+        for step in (self.step, self.step / 4):
+            params = self._search(Y, params, (level0, trend0, season0), step)
+            level0, trend0, season0 = least_squares_states(Y, *params, m)
+
+        self.alpha, self.beta, self.gamma = params
+        self.level0, self.trend0, self.season0 = level0, trend0, season0
+        self.sse, self.level, self.trend, self.season = recursions(
+            Y, self.alpha, self.beta, self.gamma, level0, trend0, season0)
+        return self
+
+    def _search(self, Y, params, states, step):
+        # Compass search run for every series at once: each round evaluates
+        # the six +/- step moves of every series in one batched pass, keeps
+        # improvements and halves the step of series that did not improve.
+        level0, trend0, season0 = states
+        cols = np.arange(Y.shape[1])
+        best_sse = recursions(Y, *params, level0, trend0, season0)[0]
+        best_sse = np.where(np.isnan(best_sse), np.inf, best_sse)
+        step = np.full(Y.shape[1], step)
+        moves = np.vstack([np.eye(3), -np.eye(3)])
+        for _ in range(self.rounds):
+            trial = params[None] + moves[:, :, None] * step
+            alpha, beta, gamma = _admissible(trial[:, 0], trial[:, 1], trial[:, 2])
+            sse = recursions(Y, alpha, beta, gamma, level0, trend0, season0[:, None, :])[0]
+            sse = np.where(np.isnan(sse), np.inf, sse)
+            move = sse.argmin(axis=0)
+            improved = sse[move, cols] < best_sse
+            moved = np.stack([alpha[move, cols], beta[move, cols], gamma[move, cols]])
+            params = np.where(improved, moved, params)
+            best_sse = np.where(improved, sse[move, cols], best_sse)
+            step = np.where(improved, step, step / 2)
+        return params
+
+    def forecast(self, steps):
+        # (steps x series) array; each series continues from its own end.
+        h = np.arange(1, steps + 1)[:, None]
+        phase = (self.lengths[None, :] + h - 1) % self.seasonal_periods
+        values = self.level + h * self.trend + self.season[phase, np.arange(len(self.lengths))]
+        return np.where(self.valid, values, np.nan)
+
+
+def forecast_many(series_list, steps=40, seasonal_periods=20):
+    # Convenience wrapper: one pd.Series forecast per input, with the same
+    # RangeIndex continuation statsmodels uses for an index without freq.
+    model = BatchHoltWinters(seasonal_periods).fit(series_list)
+    values = model.forecast(steps)
+    return [pd.Series(values[:, i], index=pd.RangeIndex(n, n + steps))
+            for i, n in enumerate(model.lengths)], model
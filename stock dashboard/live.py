@@ -0,0 +1,207 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from fetcher import fetch_many
+from providers import OHLCV_COLUMNS
+
+
+class RingBuffer:
+    # Fixed-capacity OHLCV bar buffer for one ticker. Appends overwrite the
+    # oldest bar once full; `version` increases with every change so readers
+    # can skip redraws when nothing arrived.
+    def __init__(self, capacity=2000):
+        self.capacity = capacity
+        self._times = np.zeros(capacity, dtype='datetime64[ns]')
+        self._values = np.zeros((capacity, len(OHLCV_COLUMNS)))
+        self._start = 0
+        self._size = 0
+        self.version = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def last_time(self):
+        with self._lock:
+            if not self._size:
+                return None
+            return pd.Timestamp(self._times[(self._start + self._size - 1) % self.capacity])
+
+    def append(self, bars):
+        # `bars` is a frame indexed by timestamp with OHLCV columns. A bar with
+        # the same timestamp as the newest one replaces it (still-forming bar).
+        if bars is None or bars.empty:
+            return 0
+        times = pd.DatetimeIndex(bars.index).tz_localize(None).to_numpy(dtype='datetime64[ns]')
+        values = bars.reindex(columns=OHLCV_COLUMNS).to_numpy(dtype=float)
+        added = 0
+        with self._lock:
+            for t, row in zip(times, values):
+                last = (self._start + self._size - 1) % self.capacity
+                if self._size and t < self._times[last]:
+                    continue
+                if self._size and t == self._times[last]:
+                    self._values[last] = row
+                else:
+                    end = (self._start + self._size) % self.capacity
+                    self._times[end] = t
+                    self._values[end] = row
+                    if self._size < self.capacity:
+                        self._size += 1
+                    else:
+                        self._start = (self._start + 1) % self.capacity
+                    added += 1
+            self.version += 1
+        return added
+
+    def frame(self):
+        with self._lock:
+            order = (self._start + np.arange(self._size)) % self.capacity
+            times = self._times[order].copy()
+            values = self._values[order].copy()
+        return pd.DataFrame(values, index=pd.DatetimeIndex(times, name='Date'), columns=OHLCV_COLUMNS)
+
+
+class LiveFeed:
+    # Feed interface: return new bars per ticker, given the newest timestamp
+    # already buffered (None on the first poll).
+    def poll(self, tickers, since):
+        raise NotImplementedError
+
+
+class YFinanceLiveFeed(LiveFeed):
+    # Tickers are polled concurrently through fetch_many, each with its own
+    # timeout, so one slow ticker does not hold up the others. A ticker that
+    # fails is skipped until the next poll; only a poll where every ticker
+    # failed is reported as a feed error.
+    def __init__(self, interval='1m', max_workers=8, timeout=4):
+        self.interval = interval
+        self.max_workers = max_workers
+        self.timeout = timeout
+
+    def history(self, ticker, since=None, timeout=None):
+        import yfinance as yf
+
+        hist = yf.Ticker(ticker).history(period='1d', interval=self.interval, timeout=timeout)
+        if hist.empty:
+            return hist
+        hist.index = pd.DatetimeIndex(hist.index).tz_localize(None)
+        return hist[hist.index >= since] if since is not None else hist
+
+    def poll(self, tickers, since):
+        if not tickers:
+            return {}
+        result = fetch_many(self, {ticker: {'since': since.get(ticker)} for ticker in tickers},
+                            max_workers=self.max_workers, timeout=self.timeout, retries=0)
+        if not result.data and result.errors:
+            raise RuntimeError(next(iter(result.errors.values())))
+        return result.data
+
+
+class FakeFeed(LiveFeed):
+    # Deterministic random-walk bars, one per ticker per poll, advancing a
+    # simulated clock by `step` so tests and demos need no network.
+    def __init__(self, start=None, step=pd.Timedelta(minutes=1), seed=0):
+        self.clock = pd.Timestamp(start or pd.Timestamp.now().floor('min'))
+        self.step = step
+        self.rng = np.random.default_rng(seed)
+        self.prices = {}
+
+    def poll(self, tickers, since):
+        self.clock += self.step
+        bars = {}
+        for ticker in tickers:
+            price = self.prices.get(ticker, 100.0)
+            close = price * (1 + self.rng.normal(0, 0.001))
+            high = max(price, close) * (1 + abs(self.rng.normal(0, 0.0005)))
+            low = min(price, close) * (1 - abs(self.rng.normal(0, 0.0005)))
+            self.prices[ticker] = close
+            bars[ticker] = pd.DataFrame(
+                [[price, high, low, close, float(self.rng.integers(1_000, 100_000))]],
+                index=[self.clock], columns=OHLCV_COLUMNS,
+            )
+        return bars
+
+
+class LivePoller:
+    # Background thread that polls `feed` every `interval` seconds and
+    # appends into one RingBuffer per ticker. Sessions subscribe their own
+    # tickers and the union of all live subscriptions is polled; sessions
+    # end without notice, so a subscription not renewed within `ttl`
+    # seconds (default four intervals) lapses, and the buffers of tickers no
+    # longer subscribed are dropped with it.
+    def __init__(self, feed, tickers=(), interval=5.0, capacity=2000, ttl=None):
+        self.feed = feed
+        self.interval = interval
+        self.capacity = capacity
+        self.ttl = ttl if ttl is not None else 4 * interval
+        self.buffers = {}
+        self.errors = {}
+        self._tickers = list(tickers)
+        self._subscriptions = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def subscribe(self, session, tickers):
+        with self._lock:
+            self._subscriptions[session] = (list(tickers), time.monotonic())
+
+    def unsubscribe(self, session):
+        with self._lock:
+            self._subscriptions.pop(session, None)
+
+    def tickers(self):
+        # Tickers given at construction, then those of live subscriptions in
+        # first-subscribed order.
+        with self._lock:
+            now = time.monotonic()
+            for session, (_, renewed) in list(self._subscriptions.items()):
+                if now - renewed > self.ttl:
+                    del self._subscriptions[session]
+            tickers = dict.fromkeys(self._tickers)
+            for subscribed, _ in self._subscriptions.values():
+                tickers.update(dict.fromkeys(subscribed))
+            for ticker in [t for t in self.buffers if t not in tickers]:
+                del self.buffers[ticker]
+            return list(tickers)
+
+    def buffer(self, ticker):
+        with self._lock:
+            if ticker not in self.buffers:
+                self.buffers[ticker] = RingBuffer(self.capacity)
+            return self.buffers[ticker]
+
+    def poll_once(self):
+        tickers = self.tickers()
+        since = {ticker: self.buffer(ticker).last_time for ticker in tickers}
+        try:
+            bars = self.feed.poll(tickers, since)
+        except Exception as e:
+            self.errors['feed'] = str(e) or type(e).__name__
+            return
+        self.errors.pop('feed', None)
+        for ticker, frame in bars.items():
+            self.buffer(ticker).append(frame)
+
+    def _run(self):
+        while not self._stop.is_set():
+            start = time.monotonic()
+            self.poll_once()
+            self._stop.wait(max(0.0, self.interval - (time.monotonic() - start)))
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='live-poller', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
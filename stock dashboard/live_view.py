@@ -0,0 +1,79 @@
+import os
+import threading
+import uuid
+
+import streamlit as st
+
+from charts import LINE, build_figure
+from live import FakeFeed, LivePoller, YFinanceLiveFeed
+
+
+LIVE_INTERVAL = 5
+
+
+@st.cache_resource
+def get_live_poller():
+    # One poller per server process, shared by every session. Set
+    # STOCK_LIVE_FEED=fake to run against the simulated feed.
+    feed = FakeFeed() if os.environ.get('STOCK_LIVE_FEED') == 'fake' else YFinanceLiveFeed()
+    return LivePoller(feed, interval=LIVE_INTERVAL).start()
+
+
+class LiveFigures:
+    # The current live chart per ticker, rebuilt only when its ring buffer
+    # changed. Live bars change on every poll, so they are kept out of the
+    # shared ChartFactory, where each version would push out a dashboard
+    # figure.
+    def __init__(self):
+        self._figures = {}
+        self._lock = threading.Lock()
+
+    def figure(self, ticker, buffer, frame, version):
+        with self._lock:
+            entry = self._figures.get(ticker)
+        if entry is not None and entry[0] is buffer and entry[1] == version:
+            return entry[2]
+        fig = build_figure(LINE, frame)
+        with self._lock:
+            self._figures[ticker] = (buffer, version, fig)
+        return fig
+
+    def retain(self, tickers):
+        with self._lock:
+            for ticker in [t for t in self._figures if t not in tickers]:
+                del self._figures[ticker]
+
+
+@st.cache_resource
+def get_live_figures():
+    return LiveFigures()
+
+
+@st.fragment(run_every=LIVE_INTERVAL)
+def live_panel(tickers):
+    # Reruns on its own every LIVE_INTERVAL seconds, reading only the ring
+    # buffers; the rest of the page and the daily history are left alone.
+    poller = get_live_poller()
+    # Each session keeps its own subscription alive; the poller serves the
+    # union of every session's tickers.
+    session = st.session_state.setdefault('live_session', uuid.uuid4().hex)
+    poller.subscribe(session, tickers)
+    figures = get_live_figures()
+    figures.retain(set(poller.tickers()))
+    if 'feed' in poller.errors:
+        st.warning(f"Live feed: {poller.errors['feed']}")
+
+    cols = st.columns(len(tickers))
+    for col, ticker in zip(cols, tickers):
+        buffer = poller.buffer(ticker)
+        version = buffer.version
+        frame = buffer.frame()
+        with col:
+            if frame.empty:
+                st.caption(f"{ticker}: menunggu data live...")
+                continue
+            last = frame['Close'].iloc[-1]
+            first = frame['Open'].iloc[0]
+            st.metric(ticker, f"${last:,.2f}", f"{(last / first - 1) * 100:+.2f}%")
+            fig = figures.figure(ticker, buffer, frame, version)
+            st.plotly_chart(fig, use_container_width=True, key=f"live-{ticker}")
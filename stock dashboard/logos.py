@@ -0,0 +1,161 @@
+import base64
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import METRICS
+
+
+LOGO_URLS = {
+    'GOOGL': 'https://logo.clearbit.com/google.com',
+    'AAPL': 'https://logo.clearbit.com/apple.com',
+    'MSFT': 'https://logo.clearbit.com/microsoft.com',
+    'NVDA': 'https://logo.clearbit.com/nvidia.com',
+    'TSLA': 'https://logo.clearbit.com/tesla.com',
+    'INTC': 'https://logo.clearbit.com/intel.com'
+}
+PLACEHOLDER_URL = 'https://via.placeholder.com/150'
+
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'logos')
+
+
+def get_company_logo(ticker):
+    return LOGO_URLS.get(ticker, PLACEHOLDER_URL)
+
+
+def _mime(content):
+    if content.startswith(b'\x89PNG'):
+        return 'image/png'
+    if content.startswith(b'\xff\xd8'):
+        return 'image/jpeg'
+    if content.startswith(b'GIF8'):
+        return 'image/gif'
+    if content[:4] == b'RIFF' and content[8:12] == b'WEBP':
+        return 'image/webp'
+    if b'<svg' in content[:512]:
+        return 'image/svg+xml'
+    return None
+
+
+class LogoCache:
+    # Logos are served from a bounded in-memory LRU, then from an on-disk
+    # cache with a TTL. Misses are fetched in the background on a pooled
+    # session; until then `src` returns the remote URL so rendering never waits.
+    def __init__(self, cache_dir=DEFAULT_DIR, max_items=256, ttl=7 * 24 * 3600,
+                 max_workers=8, timeout=5, retry_after=600):
+        self.cache_dir = cache_dir
+        self.max_items = max_items
+        self.ttl = ttl
+        self.timeout = timeout
+        self.retry_after = retry_after
+        os.makedirs(cache_dir, exist_ok=True)
+        self._memory = OrderedDict()
+        self._inflight = set()
+        self._failed = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='logo')
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
+
+    def _path(self, ticker):
+        return os.path.join(self.cache_dir, re.sub(r'[^A-Za-z0-9._-]', '_', ticker) + '.img')
+
+    def _remember(self, ticker, uri):
+        with self._lock:
+            self._memory[ticker] = uri
+            self._memory.move_to_end(ticker)
+            while len(self._memory) > self.max_items:
+                self._memory.popitem(last=False)
+
+    def get(self, ticker):
+        with self._lock:
+            uri = self._memory.get(ticker)
+            if uri is not None:
+                self._memory.move_to_end(ticker)
+                METRICS.cache('logo', True)
+                return uri
+        path = self._path(ticker)
+        try:
+            if time.time() - os.path.getmtime(path) < self.ttl:
+                with open(path, 'rb') as f:
+                    content = f.read()
+                mime = _mime(content)
+                if mime is not None:
+                    uri = f"data:{mime};base64,{base64.b64encode(content).decode('ascii')}"
+                    self._remember(ticker, uri)
+                    METRICS.cache('logo', True)
+                    return uri
+        except OSError:
+            pass
+        METRICS.cache('logo', False)
+        self.prefetch([ticker])
+        return None
+
+    def src(self, ticker):
+        return self.get(ticker) or get_company_logo(ticker)
+
+    def _on_disk(self, ticker):
+        try:
+            return time.time() - os.path.getmtime(self._path(ticker)) < self.ttl
+        except OSError:
+            return False
+
+    def prefetch(self, tickers):
+        # A fresh disk entry needs no download: `get` loads it on first use,
+        # so a restarted process does not refetch every logo.
+        tickers = [t for t in tickers if t in self._memory or not self._on_disk(t)]
+        with self._lock:
+            now = time.time()
+            todo = [
+                t for t in tickers
+                if t not in self._memory and t not in self._inflight
+                and now - self._failed.get(t, 0) > self.retry_after
+            ]
+            self._inflight.update(todo)
+        for ticker in todo:
+            self._executor.submit(self._fetch, ticker)
+
+    def _fetch(self, ticker):
+        try:
+            with METRICS.timer('logo_fetch', ticker):
+                response = self._session.get(get_company_logo(ticker), timeout=self.timeout)
+            response.raise_for_status()
+            mime = _mime(response.content)
+            if mime is None:
+                raise ValueError(f"Unrecognized logo format for {ticker}")
+            path = self._path(ticker)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, 'wb') as f:
+                f.write(response.content)
+            os.replace(tmp, path)
+            self._remember(ticker, f"data:{mime};base64,{base64.b64encode(response.content).decode('ascii')}")
+        except Exception:
+            with self._lock:
+                self._failed[ticker] = time.time()
+        finally:
+            with self._lock:
+                self._inflight.discard(ticker)
+
+
+class OfflineLogoCache(LogoCache):
+    # Serves what is already cached and never downloads; cards without a
+    # cached logo show the remote URL.
+    def prefetch(self, tickers):
+        pass
+
+
+def open_logo_cache():
+    # Logo cache used by the pages. STOCK_PROVIDER=synthetic makes it
+    # offline, like the price store, so demos and benchmarks make no network
+    # calls.
+    if os.environ.get('STOCK_PROVIDER') == 'synthetic':
+        return OfflineLogoCache()
+    return LogoCache()
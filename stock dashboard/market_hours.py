@@ -0,0 +1,80 @@
+import datetime
+from collections import namedtuple
+
+import pandas as pd
+
+
+Session = namedtuple('Session', 'tz open close')
+
+NYSE = Session('America/New_York', datetime.time(9, 30), datetime.time(16, 0))
+
+# Regular sessions by Yahoo ticker suffix; tickers without a suffix are US
+# listings. Midday breaks are not modelled.
+EXCHANGES = {
+    '': NYSE,
+    '.JK': Session('Asia/Jakarta', datetime.time(9, 0), datetime.time(16, 0)),
+    '.SI': Session('Asia/Singapore', datetime.time(9, 0), datetime.time(17, 0)),
+    '.KL': Session('Asia/Kuala_Lumpur', datetime.time(9, 0), datetime.time(17, 0)),
+    '.HK': Session('Asia/Hong_Kong', datetime.time(9, 30), datetime.time(16, 0)),
+    '.T': Session('Asia/Tokyo', datetime.time(9, 0), datetime.time(15, 30)),
+    '.AX': Session('Australia/Sydney', datetime.time(10, 0), datetime.time(16, 0)),
+    '.NS': Session('Asia/Kolkata', datetime.time(9, 15), datetime.time(15, 30)),
+    '.L': Session('Europe/London', datetime.time(8, 0), datetime.time(16, 30)),
+    '.DE': Session('Europe/Berlin', datetime.time(9, 0), datetime.time(17, 30)),
+    '.PA': Session('Europe/Paris', datetime.time(9, 0), datetime.time(17, 30)),
+    '.TO': Session('America/Toronto', datetime.time(9, 30), datetime.time(16, 0)),
+}
+# Daily bars can still be revised shortly after the close.
+SETTLE = pd.Timedelta(minutes=30)
+
+
+def session_for(ticker):
+    # The exchange session of `ticker`, or None when it is not in EXCHANGES:
+    # other suffixes, indices (^GSPC), currencies and futures (EURUSD=X,
+    # GC=F) and crypto pairs (BTC-USD), several of which trade around the
+    # clock.
+    if ticker.startswith('^') or '=' in ticker or '-' in ticker:
+        return None
+    dot = ticker.rfind('.')
+    return EXCHANGES.get(ticker[dot:].upper() if dot > 0 else '')
+
+
+def _local(t, session):
+    return pd.Timestamp(t, unit='s', tz='UTC').tz_convert(session.tz)
+
+
+def _at(local, time):
+    # `time` on the calendar day of `local`; replace() keeps wall-clock time
+    # right on DST switch days, where adding a Timedelta to midnight would not.
+    return local.replace(hour=time.hour, minute=time.minute, second=0, microsecond=0, nanosecond=0)
+
+
+def in_session(t, session=NYSE):
+    # True from the open until SETTLE after the close on a weekday. Exchange
+    # holidays are not modelled; on one the store does a refresh that finds
+    # no new bar.
+    local = _local(t, session)
+    if local.weekday() >= 5:
+        return False
+    return _at(local, session.open) <= local <= _at(local, session.close) + SETTLE
+
+
+def next_open(t, session=NYSE):
+    local = _local(t, session)
+    day = local
+    while True:
+        open_ = _at(day, session.open)
+        if open_ > local and open_.weekday() < 5:
+            return open_.timestamp()
+        day = day + pd.DateOffset(days=1)
+
+
+def expires_at(checked_at, max_age, ticker=''):
+    # Epoch seconds until which daily bars of `ticker` checked at
+    # `checked_at` stay fresh: `max_age` while its exchange is in session,
+    # otherwise until the next open, since nothing changes while the market
+    # is closed. Tickers with no known session always get `max_age`.
+    session = session_for(ticker)
+    if session is None or in_session(checked_at, session):
+        return checked_at + max_age
+    return next_open(checked_at, session)
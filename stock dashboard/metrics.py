@@ -0,0 +1,216 @@
+import bisect
+import importlib.util
+import io
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+OTHER = '(other)'
+PROFILERS = ('cprofile', 'pyinstrument')
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def available_profilers():
+    # cProfile ships with Python; pyinstrument is an optional install.
+    return [kind for kind in PROFILERS if kind == 'cprofile' or importlib.util.find_spec(kind) is not None]
+
+
+class Histogram:
+    # Fixed-bucket latency histogram (Prometheus style); quantiles are
+    # interpolated inside the bucket they fall in.
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q):
+        if not self.count:
+            return float('nan')
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = self.buckets[i - 1] if i else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / n, self.max)
+            seen += n
+        return self.max
+
+    def row(self):
+        return dict(
+            count=self.count,
+            mean_ms=self.sum / self.count * 1000 if self.count else float('nan'),
+            p50_ms=self.quantile(0.5) * 1000,
+            p95_ms=self.quantile(0.95) * 1000,
+            p99_ms=self.quantile(0.99) * 1000,
+            max_ms=self.max * 1000,
+        )
+
+
+class Metrics:
+    # Process-wide stage timings and cache counters. Every observation goes
+    # into the stage total and, when a ticker is given, into a per-ticker
+    # histogram; past `max_tickers` distinct tickers per stage the rest are
+    # folded into OTHER so user input cannot grow it without bound.
+    def __init__(self, max_tickers=500):
+        self.max_tickers = max_tickers
+        self.started_at = time.time()
+        self.last_profile = None
+        self._exported_at = 0.0
+        self._stages = {}
+        self._tickers = {}
+        self._caches = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds, ticker=None):
+        with self._lock:
+            self._stages.setdefault(stage, Histogram()).observe(seconds)
+            if ticker is not None:
+                per_ticker = self._tickers.setdefault(stage, {})
+                if ticker not in per_ticker and len(per_ticker) >= self.max_tickers:
+                    ticker = OTHER
+                per_ticker.setdefault(ticker, Histogram()).observe(seconds)
+
+    @contextmanager
+    def timer(self, stage, ticker=None):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start, ticker)
+
+    def cache(self, name, hit):
+        with self._lock:
+            counts = self._caches.setdefault(name, [0, 0])
+            counts[0 if hit else 1] += 1
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+            self._tickers.clear()
+            self._caches.clear()
+            self.started_at = time.time()
+
+    def stage_rows(self):
+        with self._lock:
+            return [dict(stage=stage, **h.row()) for stage, h in sorted(self._stages.items())]
+
+    def ticker_stages(self):
+        with self._lock:
+            return sorted(self._tickers)
+
+    def ticker_rows(self, stage):
+        with self._lock:
+            per_ticker = self._tickers.get(stage, {})
+            return [dict(ticker=ticker, total_ms=h.sum * 1000, **h.row())
+                    for ticker, h in sorted(per_ticker.items(), key=lambda item: -item[1].sum)]
+
+    def cache_rows(self):
+        with self._lock:
+            return [dict(cache=name, hits=hits, misses=misses,
+                         hit_rate=hits / (hits + misses) if hits + misses else float('nan'))
+                    for name, (hits, misses) in sorted(self._caches.items())]
+
+    def prometheus(self):
+        out = io.StringIO()
+        with self._lock:
+            out.write("# HELP stock_stage_seconds Latency of dashboard pipeline stages.\n")
+            out.write("# TYPE stock_stage_seconds histogram\n")
+            for stage, h in sorted(self._stages.items()):
+                cumulative = 0
+                for bound, n in zip(list(h.buckets) + ['+Inf'], h.counts):
+                    cumulative += n
+                    out.write(f'stock_stage_seconds_bucket{{stage="{_label(stage)}",le="{bound}"}} {cumulative}\n')
+                out.write(f'stock_stage_seconds_sum{{stage="{_label(stage)}"}} {h.sum}\n')
+                out.write(f'stock_stage_seconds_count{{stage="{_label(stage)}"}} {h.count}\n')
+            out.write("# HELP stock_stage_ticker_seconds Per-ticker time spent in each stage.\n")
+            out.write("# TYPE stock_stage_ticker_seconds summary\n")
+            for stage, per_ticker in sorted(self._tickers.items()):
+                for ticker, h in sorted(per_ticker.items()):
+                    labels = f'stage="{_label(stage)}",ticker="{_label(ticker)}"'
+                    out.write(f'stock_stage_ticker_seconds_sum{{{labels}}} {h.sum}\n')
+                    out.write(f'stock_stage_ticker_seconds_count{{{labels}}} {h.count}\n')
+            out.write("# HELP stock_cache_requests_total Cache lookups by result.\n")
+            out.write("# TYPE stock_cache_requests_total counter\n")
+            for name, (hits, misses) in sorted(self._caches.items()):
+                out.write(f'stock_cache_requests_total{{cache="{_label(name)}",result="hit"}} {hits}\n')
+                out.write(f'stock_cache_requests_total{{cache="{_label(name)}",result="miss"}} {misses}\n')
+        return out.getvalue()
+
+    def jsonl(self):
+        # One JSON object per stage, per (stage, ticker) and per cache.
+        now = time.time()
+        lines = [dict(ts=now, kind='stage', **row) for row in self.stage_rows()]
+        for stage in self.ticker_stages():
+            lines += [dict(ts=now, kind='ticker', stage=stage, **row) for row in self.ticker_rows(stage)]
+        lines += [dict(ts=now, kind='cache', **row) for row in self.cache_rows()]
+        return ''.join(json.dumps(line) + '\n' for line in lines)
+
+    def export(self, directory, min_interval=15):
+        # Textfile export for a node_exporter-style scraper: metrics.prom is
+        # replaced atomically, metrics.jsonl gets one snapshot appended. Calls
+        # within `min_interval` seconds of the last export are skipped.
+        with self._lock:
+            if time.time() - self._exported_at < min_interval:
+                return False
+            self._exported_at = time.time()
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, 'metrics.prom')
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            f.write(self.prometheus())
+        os.replace(tmp, path)
+        with open(os.path.join(directory, 'metrics.jsonl'), 'a') as f:
+            f.write(self.jsonl())
+        return True
+
+    @contextmanager
+    def profile(self, kind='cprofile', label=None, limit=40):
+        # Profiles the enclosed block and keeps the report in `last_profile`.
+        # kind='pyinstrument' falls back to cProfile when pyinstrument is not
+        # installed.
+        if kind not in available_profilers():
+            kind = 'cprofile'
+        if kind == 'pyinstrument':
+            from pyinstrument import Profiler
+
+            profiler = Profiler()
+            start, stop = profiler.start, profiler.stop
+
+            def report():
+                return profiler.output_text(unicode=True)
+        else:
+            import cProfile
+            import pstats
+
+            profiler = cProfile.Profile()
+            start, stop = profiler.enable, profiler.disable
+
+            def report():
+                out = io.StringIO()
+                pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(limit)
+                return out.getvalue()
+
+        start()
+        try:
+            yield
+        finally:
+            stop()
+            self.last_profile = dict(kind=kind, label=label, at=time.time(), report=report())
+
+METRICS = Metrics()
@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from pandas.tseries.offsets import BDay
+from sklearn.ensemble import RandomForestRegressor
+
+from features import build_features, feature_names, lookback, training_frame
+from metrics import METRICS
+
+
+def _predict_trees(estimators, X):
+    return np.stack([tree.tree_.predict(X).reshape(len(X), -1)[:, 0] for tree in estimators])
+
+
+def _predict_own_block(pairs, X, block):
+    return np.stack([tree.tree_.predict(X[t * block:(t + 1) * block]).reshape(block, -1)[:, 0]
+                     for t, tree in pairs])
+
+
+def path_predictions(model, X, n_jobs=None):
+    # X stacks one block of rows per tree; tree t only evaluates block t.
+    # Returns (n_trees, block).
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    pairs = list(enumerate(model.estimators_))
+    block = len(X) // len(pairs)
+    if not n_jobs or n_jobs == 1:
+        return _predict_own_block(pairs, X, block)
+    n_chunks = min(len(pairs), n_jobs if n_jobs > 0 else 8)
+    chunks = [pairs[i::n_chunks] for i in range(n_chunks)]
+    parts = Parallel(n_jobs=n_jobs, prefer='threads')(delayed(_predict_own_block)(c, X, block) for c in chunks)
+    order = np.concatenate([[t for t, _ in c] for c in chunks])
+    out = np.empty((len(pairs), block))
+    out[order] = np.concatenate(parts)
+    return out
+
+
+def tree_predictions(model, X, n_jobs=None):
+    # (n_trees, n_rows) predictions of a fitted forest, calling the tree
+    # structures directly to skip per-estimator input validation. With
+    # `n_jobs`, chunks of trees are evaluated on a thread pool.
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    estimators = model.estimators_
+    if not n_jobs or n_jobs == 1:
+        return _predict_trees(estimators, X)
+    n_chunks = min(len(estimators), n_jobs if n_jobs > 0 else 8)
+    chunks = [estimators[i::n_chunks] for i in range(n_chunks)]
+    parts = Parallel(n_jobs=n_jobs, prefer='threads')(delayed(_predict_trees)(chunk, X) for chunk in chunks)
+    return np.concatenate(parts)
+
+
+def fit_forest(close, n_estimators=100, n_jobs=-1, random_state=None, **feature_kwargs):
+    # One forest over every ticker in the (date x ticker) close panel.
+    X, y = training_frame(close, **feature_kwargs)
+    model = RandomForestRegressor(n_estimators=n_estimators, max_depth=None, min_samples_split=2,
+                                  n_jobs=n_jobs, random_state=random_state)
+    ticker = close.columns[0] if close.shape[1] == 1 else None
+    with METRICS.timer('random_forest_fit', ticker):
+        model.fit(X.to_numpy(), y.to_numpy())
+    model.feature_kwargs = feature_kwargs
+    return model
+
+
+def _last_rows(panel, names, feature_kwargs):
+    features = build_features(panel, **feature_kwargs)
+    return np.column_stack([features[name][-1] for name in names])
+
+
+def recursive_forecast(model, close, steps=40, quantiles=(0.05, 0.95), mode='paths', n_jobs=None):
+    # Rolls the forest forward `steps` business days for every ticker in
+    # `close` at once: each step is one batched tree evaluation over all
+    # tickers. mode='paths' lets every tree follow its own trajectory and
+    # takes the interval from the spread of the paths; mode='mean' feeds the
+    # forest mean back in and uses per-step tree quantiles.
+    # Returns {'forecast', 'lower', 'upper'} frames of (date x ticker).
+    feature_kwargs = getattr(model, 'feature_kwargs', {})
+    names = feature_names(**feature_kwargs)
+    close = close.ffill()
+    tickers = list(close.columns)
+    window = close.iloc[-lookback(**feature_kwargs):]
+    n_trees = len(model.estimators_)
+    dates = pd.bdate_range(close.index[-1] + BDay(1), periods=steps)
+
+    if mode == 'paths':
+        values = np.tile(window.to_numpy(dtype=float), (1, n_trees))
+        paths = np.empty((steps, n_trees, len(tickers)))
+        columns = pd.RangeIndex(values.shape[1])
+        index = window.index
+        for h, date in enumerate(dates):
+            index = index[1:].append(pd.DatetimeIndex([date]))
+            values = np.vstack([values[1:], np.full((1, values.shape[1]), np.nan)])
+            X = _last_rows(pd.DataFrame(values, index=index, columns=columns), names, feature_kwargs)
+            step = path_predictions(model, X, n_jobs=n_jobs)
+            values[-1] = step.ravel()
+            paths[h] = step
+        point = paths.mean(axis=1)
+        lower, upper = (np.quantile(paths, q, axis=1) for q in quantiles)
+    else:
+        values = window.to_numpy(dtype=float)
+        index = window.index
+        point = np.empty((steps, len(tickers)))
+        lower = np.empty_like(point)
+        upper = np.empty_like(point)
+        for h, date in enumerate(dates):
+            index = index[1:].append(pd.DatetimeIndex([date]))
+            values = np.vstack([values[1:], np.full((1, len(tickers)), np.nan)])
+            X = _last_rows(pd.DataFrame(values, index=index, columns=tickers), names, feature_kwargs)
+            trees = tree_predictions(model, X, n_jobs=n_jobs)
+            point[h] = trees.mean(axis=0)
+            lower[h], upper[h] = np.quantile(trees, quantiles, axis=0)
+            values[-1] = point[h]
+
+    return {
+        name: pd.DataFrame(arr, index=dates, columns=tickers)
+        for name, arr in (('forecast', point), ('lower', lower), ('upper', upper))
+    }
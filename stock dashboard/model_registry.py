@@ -0,0 +1,134 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+
+import joblib
+import pandas as pd
+
+from forecast_cache import fingerprint
+from single_flight import SingleFlight
+
+
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'models')
+
+
+class ModelRegistry:
+    # Versioned store of fitted models: <root>/<name>/v0001/{model.joblib,
+    # meta.json}. Models are dumped uncompressed, so a load is a plain
+    # unpickle without decompression. scikit-learn trees copy their node
+    # arrays when unpickled, so every process holds its own copy of a
+    # forest; the last loaded version of each name is memoized so that
+    # happens once per process, and loading another version replaces it.
+    def __init__(self, root=DEFAULT_DIR):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._loaded = {}
+        self._lock = threading.Lock()
+        # Concurrent retrains of the same name, coalesced by the callers.
+        self.flights = SingleFlight()
+
+    def _dir(self, name, version):
+        return os.path.join(self.root, name, f"v{version:04d}")
+
+    def versions(self, name):
+        try:
+            entries = os.listdir(os.path.join(self.root, name))
+        except OSError:
+            return []
+        return sorted(int(e[1:]) for e in entries if e.startswith('v') and e[1:].isdigit())
+
+    def register(self, name, model, **metadata):
+        with self._lock:
+            version = (self.versions(name) or [0])[-1] + 1
+            target = self._dir(name, version)
+            tmp = f"{target}.{os.getpid()}.tmp"
+            os.makedirs(tmp)
+            joblib.dump(model, os.path.join(tmp, 'model.joblib'))
+            meta = dict(metadata, name=name, version=version,
+                        created_at=pd.Timestamp.now().isoformat(timespec='seconds'))
+            with open(os.path.join(tmp, 'meta.json'), 'w') as f:
+                json.dump(meta, f, indent=2, default=str)
+            os.rename(tmp, target)
+        return version
+
+    def metadata(self, name, version=None):
+        version = version or (self.versions(name) or [None])[-1]
+        if version is None:
+            return None
+        with open(os.path.join(self._dir(name, version), 'meta.json')) as f:
+            return json.load(f)
+
+    def load(self, name, version=None):
+        version = version or (self.versions(name) or [None])[-1]
+        if version is None:
+            return None, None
+        with self._lock:
+            loaded = self._loaded.get(name)
+            if loaded is not None and loaded[0] == version:
+                return loaded[1]
+        model = joblib.load(os.path.join(self._dir(name, version), 'model.joblib'))
+        entry = (model, self.metadata(name, version))
+        with self._lock:
+            self._loaded[name] = (version, entry)
+        return entry
+
+    def prune(self, name, keep=3):
+        for version in self.versions(name)[:-keep]:
+            shutil.rmtree(self._dir(name, version), ignore_errors=True)
+            with self._lock:
+                if self._loaded.get(name, (None,))[0] == version:
+                    del self._loaded[name]
+
+
+def training_metadata(close, features, params):
+    return dict(
+        training_start=close.index[0].strftime('%Y-%m-%d'),
+        training_end=close.index[-1].strftime('%Y-%m-%d'),
+        n_rows=int(close.notna().sum().sum()),
+        tickers=list(map(str, close.columns)),
+        features=list(features),
+        params=params,
+        data_fingerprint=fingerprint(close),
+    )
+
+
+def train_forest(registry, name, close, n_estimators=100):
+    from features import feature_names
+    from ml_forecast import fit_forest
+
+    model = fit_forest(close, n_estimators=n_estimators)
+    return registry.register(name, model, **training_metadata(
+        close, feature_names(), dict(model='random_forest', n_estimators=n_estimators)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train and register per-ticker RandomForest models.")
+    parser.add_argument('--tickers', required=True, help="Comma separated tickers, or @file with one per line")
+    parser.add_argument('--period', default='2y')
+    parser.add_argument('--n-estimators', type=int, default=100)
+    parser.add_argument('--keep', type=int, default=3, help="Versions to keep per model")
+    args = parser.parse_args(argv)
+
+    from batch_forecast import parse_tickers
+    from price_store import PriceStore
+
+    registry = ModelRegistry()
+    data, errors = PriceStore().get(parse_tickers(args.tickers), period=args.period)
+    for ticker, error in errors.items():
+        print(f"{ticker}: fetch failed: {error}", file=sys.stderr)
+    for ticker, df in data.items():
+        start = time.perf_counter()
+        name = f"rf-{ticker}"
+        version = train_forest(registry, name, df[['Close']].rename(columns={'Close': ticker}),
+                               n_estimators=args.n_estimators)
+        registry.prune(name, keep=args.keep)
+        print(f"{name} v{version}: {time.perf_counter() - start:.2f}s")
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
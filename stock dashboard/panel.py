@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+
+
+FIELD_DTYPES = {
+    'Open': np.float32,
+    'High': np.float32,
+    'Low': np.float32,
+    'Close': np.float32,
+    'Volume': np.float64,
+}
+
+
+class Panel:
+    # Columnar multi-ticker OHLCV: one shared date axis and one
+    # (date x ticker) array per field, float32 prices and float64 volume.
+    # Arrays are read-only so a single instance can be handed to every
+    # session; a missing bar is NaN in every field, Volume included, so it
+    # does not count as a zero-volume day in averages.
+    def __init__(self, dates, tickers, fields):
+        self.dates = pd.DatetimeIndex(dates, name='Date')
+        self.tickers = list(tickers)
+        self._columns = {ticker: i for i, ticker in enumerate(self.tickers)}
+        self.fields = {}
+        for name, values in fields.items():
+            values = np.ascontiguousarray(values)
+            values.setflags(write=False)
+            self.fields[name] = values
+
+    @classmethod
+    def from_frames(cls, data, dtypes=FIELD_DTYPES):
+        tickers = list(data)
+        dates = pd.DatetimeIndex([])
+        for df in data.values():
+            dates = dates.union(pd.DatetimeIndex(df.index).tz_localize(None).normalize())
+        fields = {}
+        for name, dtype in dtypes.items():
+            missing = 0 if np.issubdtype(dtype, np.integer) else np.nan
+            values = np.full((len(dates), len(tickers)), missing, dtype=dtype)
+            for i, ticker in enumerate(tickers):
+                df = data[ticker]
+                if name not in df.columns:
+                    continue
+                rows = dates.get_indexer(pd.DatetimeIndex(df.index).tz_localize(None).normalize())
+                column = df[name].to_numpy()
+                if missing == 0:
+                    column = np.nan_to_num(column, nan=0)
+                values[rows, i] = column.astype(dtype)
+            fields[name] = values
+        return cls(dates, tickers, fields)
+
+    def __contains__(self, ticker):
+        return ticker in self._columns
+
+    def __getitem__(self, ticker):
+        return self.frame(ticker)
+
+    def __len__(self):
+        return len(self.tickers)
+
+    @property
+    def nbytes(self):
+        return sum(values.nbytes for values in self.fields.values()) + self.dates.nbytes
+
+    def wide(self, field):
+        return pd.DataFrame(self.fields[field], index=self.dates, columns=self.tickers, copy=False)
+
+    def frame(self, ticker):
+        # Per-ticker OHLCV frame over the dates that ticker has a bar for;
+        # built on demand, so sessions do not hold their own copies.
+        i = self._columns[ticker]
+        valid = ~np.isnan(self.fields['Close'][:, i])
+        return pd.DataFrame(
+            {name: values[valid, i] for name, values in self.fields.items()},
+            index=self.dates[valid],
+        )
+
+    def frames(self, tickers=None):
+        return {ticker: self.frame(ticker) for ticker in (tickers or self.tickers)}
@@ -0,0 +1,150 @@
+import argparse
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+from artifacts import DEFAULT_DIR, load_manifest, load_summary
+from batch_forecast import FEATURES, MODEL_PARAMS, iter_forecasts, make_jobs, parse_tickers
+from forecast_cache import fingerprint
+from price_store import PriceStore
+from summary import market_summary
+
+
+class StageTimer:
+    def __init__(self):
+        self.timings = {}
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - start
+
+    def report(self, out=sys.stdout):
+        for name, elapsed in self.timings.items():
+            print(f"{name:<12} {elapsed:8.2f}s", file=out)
+
+
+def _write_atomic(path, write):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def _write_json(path, obj):
+    def write(tmp):
+        with open(tmp, 'w') as f:
+            json.dump(obj, f, indent=2, default=str)
+    _write_atomic(path, write)
+
+
+def summary_cards(data):
+    summary = market_summary(data)
+    summary['Date'] = summary['Date'].dt.strftime('%Y-%m-%d')
+    return summary.reset_index().to_dict(orient='records')
+
+
+def forecast_frame(df, result, steps):
+    index = pd.date_range(start=df.index[-1], periods=steps + 1, freq='B')[1:]
+    forecast = pd.Series(result.forecast).to_numpy()
+    conf_int = pd.Series(result.conf_int).to_numpy()
+    return pd.DataFrame({
+        'date': index,
+        'feature': result.feature,
+        'model': result.model,
+        'forecast': forecast,
+        'lower': forecast - conf_int,
+        'upper': forecast + conf_int,
+    })
+
+
+def precompute(tickers, since=None, period='1y', steps=40, models=('holt_winters',), out_dir=DEFAULT_DIR,
+               store=None, max_workers=None, timer=None):
+    # Materializes OHLCV, summary cards and forecasts for `tickers` under
+    # `out_dir`. Tickers whose bars are unchanged since the last run are
+    # skipped, so re-running is cheap and leaves identical artifacts. The
+    # manifest records the history window and forecast parameters used, and
+    # the pages serve artifacts only when those match their own.
+    timer = timer or StageTimer()
+    params = {model: MODEL_PARAMS[model](steps) for model in models}
+    store = store or PriceStore()
+    manifest = load_manifest(out_dir)
+
+    with timer.stage('fetch'):
+        data, errors = store.get(tickers, period=period, start=since)
+
+    changed = {}
+    with timer.stage('ohlcv'):
+        for ticker, df in data.items():
+            key = fingerprint(df, dict(since=str(since), period=period, forecasts=params))
+            if manifest.get(ticker, {}).get('fingerprint') == key:
+                continue
+            changed[ticker] = key
+            _write_atomic(os.path.join(out_dir, 'ohlcv', f"{ticker}.parquet"), df.to_parquet)
+
+    with timer.stage('summary'):
+        cards = {card['Ticker']: card for card in load_summary(out_dir)}
+        if changed:
+            cards.update((card['Ticker'], card) for card in summary_cards({t: data[t] for t in changed}))
+        _write_json(os.path.join(out_dir, 'summary.json'), [cards[t] for t in sorted(cards)])
+
+    failed = {}
+    with timer.stage('forecast'):
+        frames = {ticker: [] for ticker in changed}
+        jobs = make_jobs({t: data[t] for t in changed}, features=FEATURES, models=models, steps=steps)
+        for result in iter_forecasts(jobs, max_workers=max_workers):
+            if result.error:
+                failed[f"{result.ticker}:{result.feature}"] = result.error
+            else:
+                frames[result.ticker].append(forecast_frame(data[result.ticker], result, steps))
+        for ticker, parts in frames.items():
+            if parts:
+                frame = pd.concat(parts, ignore_index=True)
+                _write_atomic(os.path.join(out_dir, 'forecasts', f"{ticker}.parquet"), frame.to_parquet)
+
+    with timer.stage('manifest'):
+        for ticker, key in changed.items():
+            if not any(k.startswith(f"{ticker}:") for k in failed):
+                manifest[ticker] = {
+                    'fingerprint': key,
+                    'last_date': data[ticker].index[-1].strftime('%Y-%m-%d'),
+                    'period': period,
+                    'since': since,
+                    'forecasts': params,
+                    'generated_at': pd.Timestamp.now().isoformat(timespec='seconds'),
+                }
+        _write_json(os.path.join(out_dir, 'manifest.json'), manifest)
+
+    errors.update(failed)
+    return changed, errors, timer
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute dashboard and forecast artifacts.")
+    parser.add_argument('--tickers', required=True, help="Comma separated tickers, or @file with one per line")
+    parser.add_argument('--since', help="First date to include (YYYY-MM-DD); defaults to --period")
+    parser.add_argument('--period', default='1y')
+    parser.add_argument('--steps', type=int, default=40)
+    parser.add_argument('--out', default=DEFAULT_DIR)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args(argv)
+
+    tickers = parse_tickers(args.tickers)
+    changed, errors, timer = precompute(tickers, since=args.since, period=args.period, steps=args.steps,
+                                        out_dir=args.out, max_workers=args.workers)
+    for name, error in errors.items():
+        print(f"{name}: {error}", file=sys.stderr)
+    print(f"{len(changed)} of {len(tickers)} tickers updated in {args.out}")
+    timer.report()
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,182 @@
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+from fetcher import fetch_many
+from market_hours import expires_at
+from metrics import METRICS
+from providers import OHLCV_COLUMNS, SyntheticProvider, YFinanceProvider, normalize_history, period_start
+from single_flight import SingleFlight
+
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'prices.sqlite')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS prices (
+    ticker TEXT NOT NULL,
+    date TEXT NOT NULL,
+    open REAL, high REAL, low REAL, close REAL, volume REAL,
+    PRIMARY KEY (ticker, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    ticker TEXT PRIMARY KEY,
+    covered_from TEXT NOT NULL,
+    checked_at REAL NOT NULL
+);
+"""
+
+
+def _flight_key(ticker, kwargs):
+    return ticker, tuple(sorted(kwargs.items()))
+
+
+class PriceStore:
+    # Local OHLCV store keyed by (ticker, date). Bars already on disk are kept;
+    # a refresh only asks the provider for bars from the last stored date on.
+    # During the session a ticker is refreshed at most once every `max_age`
+    # seconds; once the market has closed its bars are final until the next
+    # open. Concurrent identical refreshes are coalesced into one fetch.
+    def __init__(self, path=DEFAULT_PATH, provider=None, max_age=900, max_workers=8):
+        self.path = path
+        self.provider = provider or YFinanceProvider()
+        self.max_age = max_age
+        self.max_workers = max_workers
+        self._flights = SingleFlight()
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._memory_conn = sqlite3.connect(path, check_same_thread=False) if path == ':memory:' else None
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = self._memory_conn
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+        try:
+            with conn:
+                yield conn
+        finally:
+            if conn is not self._memory_conn:
+                conn.close()
+
+    def get(self, tickers, period="1y", force=False, start=None):
+        # Returns ({ticker: bars}, {ticker: error}). A ticker whose refresh
+        # failed still gets whatever bars are already stored. An explicit
+        # `start` date takes precedence over `period`.
+        requests, covered = {}, {}
+        for ticker in tickers:
+            plan = self._plan(ticker, period, force, start)
+            METRICS.cache('price_store', plan is None)
+            if plan is not None:
+                requests[ticker], covered[ticker] = plan
+        claimed, waiting = {}, {}
+        for ticker, kwargs in requests.items():
+            flight, owner = self._flights.claim(_flight_key(ticker, kwargs))
+            (claimed if owner else waiting)[ticker] = flight
+        errors = {}
+        if claimed:
+            try:
+                result = fetch_many(self.provider, {t: requests[t] for t in claimed},
+                                    max_workers=self.max_workers)
+                for ticker, hist in result.data.items():
+                    self.write(ticker, hist, covered_from=covered[ticker])
+            except BaseException as e:
+                for ticker in claimed:
+                    self._flights.resolve(_flight_key(ticker, requests[ticker]), error=e)
+                raise
+            errors.update(result.errors)
+            for ticker in claimed:
+                self._flights.resolve(_flight_key(ticker, requests[ticker]), result.errors.get(ticker))
+        for ticker, flight in waiting.items():
+            # Another thread is fetching the same bars; its outcome (an error
+            # message or None) is ours too.
+            try:
+                error = flight.result()
+            except Exception as e:
+                error = str(e) or type(e).__name__
+            if error is not None:
+                errors[ticker] = error
+        start = pd.Timestamp(start) if start is not None else period_start(period)
+        data = {}
+        for ticker in tickers:
+            df = self.load(ticker, start=start)
+            if not df.empty:
+                data[ticker] = df
+            elif ticker not in errors:
+                errors[ticker] = f"No data for {ticker}"
+        return data, errors
+
+    def refresh(self, ticker, period="1y", force=False, start=None):
+        plan = self._plan(ticker, period, force, start)
+        if plan is None:
+            return 0
+        kwargs, covered_from = plan
+        return self.write(ticker, self.provider.history(ticker, **kwargs), covered_from=covered_from)
+
+    def _plan(self, ticker, period, force, start=None):
+        # None when the stored bars are fresh enough, else the provider kwargs
+        # to fetch and the coverage start to record afterwards.
+        full = {'period': period} if start is None else {'start': pd.Timestamp(start)}
+        start = period_start(period) if start is None else pd.Timestamp(start)
+        meta = self._meta(ticker)
+        if meta is not None and pd.Timestamp(meta[0]) <= start:
+            if not force and time.time() < expires_at(meta[1], self.max_age, ticker):
+                return None
+            last = self.last_date(ticker)
+            if last is not None:
+                # The newest stored bar is fetched again: it may have been
+                # written while its session was still trading.
+                return {'start': last}, meta[0]
+        return full, start
+
+    def write(self, ticker, hist, covered_from=None):
+        hist = normalize_history(hist) if len(hist) else hist
+        dates = hist.index.strftime('%Y-%m-%d') if len(hist) else []
+        values = hist[OHLCV_COLUMNS].to_numpy(dtype=float).tolist() if len(hist) else []
+        rows = [(ticker, date, *row) for date, row in zip(dates, values)]
+        meta = self._meta(ticker)
+        if covered_from is None:
+            covered_from = meta[0] if meta is not None else hist.index[0]
+        with self._connect() as conn:
+            conn.executemany('INSERT OR REPLACE INTO prices VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+            conn.execute(
+                'INSERT OR REPLACE INTO meta VALUES (?, ?, ?)',
+                (ticker, pd.Timestamp(covered_from).strftime('%Y-%m-%d'), time.time()),
+            )
+        return len(rows)
+
+    def load(self, ticker, start=None):
+        query = 'SELECT date, open, high, low, close, volume FROM prices WHERE ticker = ?'
+        params = [ticker]
+        if start is not None:
+            query += ' AND date >= ?'
+            params.append(pd.Timestamp(start).strftime('%Y-%m-%d'))
+        with self._connect() as conn:
+            rows = conn.execute(query + ' ORDER BY date', params).fetchall()
+        df = pd.DataFrame(rows, columns=['Date'] + OHLCV_COLUMNS)
+        df['Date'] = pd.to_datetime(df['Date'])
+        return df.set_index('Date')
+
+    def last_date(self, ticker):
+        with self._connect() as conn:
+            row = conn.execute('SELECT MAX(date) FROM prices WHERE ticker = ?', (ticker,)).fetchone()
+        return pd.Timestamp(row[0]) if row and row[0] else None
+
+    def _meta(self, ticker):
+        with self._connect() as conn:
+            return conn.execute(
+                'SELECT covered_from, checked_at FROM meta WHERE ticker = ?', (ticker,)
+            ).fetchone()
+
+
+def open_store():
+    # Store used by the pages. STOCK_PROVIDER=synthetic swaps in an in-memory
+    # store fed by SyntheticProvider, for offline demos and benchmarks.
+    if os.environ.get('STOCK_PROVIDER') == 'synthetic':
+        return PriceStore(':memory:', provider=SyntheticProvider())
+    return PriceStore()
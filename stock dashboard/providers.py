@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def normalize_history(hist):
+    hist = hist[[c for c in OHLCV_COLUMNS if c in hist.columns]].copy()
+    index = pd.DatetimeIndex(hist.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    hist.index = index.normalize()
+    hist.index.name = 'Date'
+    hist = hist[~hist.index.duplicated(keep='last')].sort_index()
+    return hist.dropna(subset=['Close'])
+
+
+class PriceProvider:
+    # Provider interface: return daily OHLCV bars for one ticker, either for
+    # a yfinance-style `period` or for every bar on/after `start`, giving up
+    # on a request after `timeout` seconds.
+    def history(self, ticker, start=None, period="1y", timeout=None):
+        raise NotImplementedError
+
+
+class YFinanceProvider(PriceProvider):
+    # yfinance is imported on first use: a page served from a fresh local
+    # store never needs it.
+    def history(self, ticker, start=None, period="1y", timeout=30):
+        import yfinance as yf
+
+        stock = yf.Ticker(ticker)
+        if start is not None:
+            hist = stock.history(start=start, timeout=timeout)
+        else:
+            hist = stock.history(period=period, timeout=timeout)
+        return normalize_history(hist)
+
+    def history_batch(self, tickers, start=None, period="1y", timeout=30):
+        import yfinance as yf
+
+        if start is not None:
+            frame = yf.download(tickers, start=start, group_by='ticker', threads=True,
+                                progress=False, timeout=timeout)
+        else:
+            frame = yf.download(tickers, period=period, group_by='ticker', threads=True,
+                                progress=False, timeout=timeout)
+        data = {}
+        if frame is None or frame.empty:
+            return data
+        for ticker in tickers:
+            if ticker in frame.columns.get_level_values(0):
+                data[ticker] = normalize_history(frame[ticker])
+        return data
+
+
+class SyntheticProvider(PriceProvider):
+    # Deterministic random-walk bars, seeded per ticker, so the store and the
+    # pages can be exercised without network access.
+    def __init__(self, end=None, days=2520):
+        self.end = pd.Timestamp(end or pd.Timestamp.today()).normalize()
+        self.days = days
+        self.calls = []
+
+    def _frame(self, ticker):
+        dates = pd.bdate_range(end=self.end, periods=self.days, name='Date')
+        rng = np.random.default_rng(sum(ord(c) * 31 ** i for i, c in enumerate(ticker)) % 2 ** 32)
+        close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, len(dates))))
+        open_ = close * (1 + rng.normal(0, 0.005, len(dates)))
+        high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.006, len(dates))))
+        low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.006, len(dates))))
+        volume = rng.integers(1_000_000, 50_000_000, len(dates)).astype(float)
+        return pd.DataFrame(
+            {'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume},
+            index=dates,
+        )
+
+    def history(self, ticker, start=None, period="1y", timeout=None):
+        self.calls.append((ticker, start, period))
+        df = self._frame(ticker)
+        if start is None:
+            start = period_start(period, self.end)
+        return df[df.index >= pd.Timestamp(start)]
+
+
+def period_start(period, today=None):
+    today = pd.Timestamp(today or pd.Timestamp.today()).normalize()
+    units = {'d': 'days', 'wk': 'weeks', 'mo': 'months', 'y': 'years'}
+    for suffix, unit in units.items():
+        if period.endswith(suffix) and period[:-len(suffix)].isdigit():
+            return today - pd.DateOffset(**{unit: int(period[:-len(suffix)])})
+    if period == 'max':
+        return pd.Timestamp('1900-01-01')
+    raise ValueError(f"Unsupported period: {period}")
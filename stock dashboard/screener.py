@@ -0,0 +1,154 @@
+import operator
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+from metrics import METRICS
+from summary import align
+
+
+FILTER_OPS = {
+    '>=': operator.ge,
+    '<=': operator.le,
+    '==': operator.eq,
+    '>': operator.gt,
+    '<': operator.lt,
+}
+_FILTER = re.compile(r'^\s*(.+?)\s*(>=|<=|==|>|<)\s*(-?\d+(?:\.\d+)?)\s*$')
+
+
+def returns_matrix(data, field='Close'):
+    # Aligned (date x ticker) simple returns from a Panel or {ticker: frame};
+    # NaN where a ticker has no bar on that day or the one before.
+    prices = align(data, field)
+    return prices.pct_change(fill_method=None).iloc[1:]
+
+
+def _moments(X):
+    # Pairwise-complete sums for the rows of X (NaN = missing), all as N x N
+    # matrix products: counts, sums of x_i, sums of x_i^2 (each over the rows
+    # where x_j is present too) and cross products.
+    present = (~np.isnan(X)).astype(float)
+    X = np.nan_to_num(X)
+    return np.stack([present.T @ present, X.T @ present, (X * X).T @ present, X.T @ X])
+
+
+class Correlations:
+    # Correlation and beta from a fixed set of pairwise-complete sums, as
+    # returned by RollingCorrelation.update.
+    def __init__(self, columns, sums):
+        self.columns = columns
+        self.sums = sums
+
+    def corr(self, min_periods=10):
+        n, sx, sxx, sxy = self.sums
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cov = n * sxy - sx * sx.T
+            var = n * sxx - sx * sx
+            corr = cov / np.sqrt(var * var.T)
+        corr[n < min_periods] = np.nan
+        np.fill_diagonal(corr, np.where(np.diag(n) >= min_periods, 1.0, np.nan))
+        return pd.DataFrame(np.clip(corr, -1, 1), index=self.columns, columns=self.columns)
+
+    def beta(self, benchmark, min_periods=10):
+        # Slope of each ticker's returns on the benchmark's, over the rows
+        # where both are present.
+        b = self.columns.index(benchmark)
+        n, sx, sxx, sxy = (m[:, b] for m in self.sums)
+        sb, sbb = self.sums[1][b], self.sums[2][b]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            beta = (n * sxy - sx * sb) / (n * sbb - sb * sb)
+        return pd.Series(np.where(n >= min_periods, beta, np.nan), index=self.columns, name='Beta')
+
+
+class RollingCorrelation:
+    # Pairwise-complete correlation and beta over the last `window` return
+    # rows. The window's sums slide with the panel: rows arriving at the end
+    # are added and rows leaving the front subtracted, so a refresh with k
+    # new bars costs O(k N^2) instead of a full recompute, also when the
+    # panel's own rolling period drops its oldest bars. The sums are rebuilt
+    # every `recompute_every` rows to shed floating-point drift, and whenever
+    # the returns no longer continue the window (other tickers, or a revised
+    # bar such as a refetched one still forming). The instance may be shared
+    # between threads, so results are read from the Correlations snapshot
+    # that update() returns.
+    def __init__(self, window=60, recompute_every=250):
+        self.window = window
+        self.recompute_every = recompute_every
+        self.dates = None
+        self.columns = None
+        self.rows = None
+        self.sums = None
+        self.updates = 0
+        self._lock = threading.Lock()
+
+    def _overlap(self, returns):
+        # Position in `returns` of the newest row in the window, or None when
+        # `returns` does not continue the window.
+        if self.dates is None or not len(self.dates) or list(returns.columns) != self.columns:
+            return None
+        end = returns.index.get_indexer([self.dates[-1]])[0]
+        if end < 0:
+            return None
+        # Window rows older than the start of `returns` are not compared.
+        k = min(len(self.dates), end + 1)
+        if not returns.index[end - k + 1:end + 1].equals(self.dates[len(self.dates) - k:]):
+            return None
+        overlap = returns.iloc[end - k + 1:end + 1].to_numpy(dtype=float)
+        return end if np.array_equal(overlap, self.rows[len(self.rows) - k:], equal_nan=True) else None
+
+    def update(self, returns):
+        with self._lock, METRICS.timer('correlation_update'):
+            values = returns.to_numpy(dtype=float)
+            size = min(self.window, len(values))
+            end = self._overlap(returns)
+            if end is not None:
+                new = values[end + 1:]
+                rows = np.vstack([self.rows, new])
+                leaving, self.rows = rows[:len(rows) - size], rows[len(rows) - size:]
+                self.updates += len(new)
+                if self.updates >= self.recompute_every:
+                    self.sums = _moments(self.rows)
+                    self.updates = 0
+                else:
+                    if len(new):
+                        self.sums += _moments(new)
+                    if len(leaving):
+                        self.sums -= _moments(leaving)
+            else:
+                self.rows = values[len(values) - size:]
+                self.sums = _moments(self.rows)
+                self.updates = 0
+            self.dates = returns.index[len(returns) - size:]
+            self.columns = list(returns.columns)
+            return Correlations(list(self.columns), self.sums.copy())
+
+def parse_filter(text, columns):
+    # "Change % > 2" -> (column, op, value); the column name is matched to
+    # `columns` case-insensitively.
+    match = _FILTER.match(text)
+    if match is None:
+        raise ValueError(f"Cannot parse filter: {text!r}")
+    name, op, value = match.groups()
+    lookup = {str(c).lower(): c for c in columns}
+    if name.lower() not in lookup:
+        raise ValueError(f"Unknown column in filter: {name!r}")
+    return lookup[name.lower()], op, float(value)
+
+
+def screen(summary, filters=(), near_high=None):
+    # Rows of `summary` passing every (column, op, value) filter and, with
+    # `near_high` set, within that many percent of their 52-week high.
+    mask = pd.Series(True, index=summary.index)
+    for column, op, value in filters:
+        mask &= FILTER_OPS[op](summary[column], value).fillna(False)
+    if near_high is not None:
+        mask &= (summary['From 52W High %'] >= -near_high).fillna(False)
+    return summary[mask]
+
+
+def top_movers(summary, n=10, column='Change %'):
+    ranked = summary.dropna(subset=[column])
+    return ranked.nlargest(n, column), ranked.nsmallest(n, column)
@@ -0,0 +1,45 @@
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    # Coalesces concurrent work on the same key: the first caller claims the
+    # key and computes, later callers get the same Future and wait on it. A
+    # key is released as soon as its result is set, so this dedupes only
+    # in-flight work; keeping results is the caller's cache's job.
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def claim(self, key):
+        # Returns (future, owner). The owner must call resolve() for the key.
+        with self._lock:
+            future = self._flights.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = self._flights[key] = Future()
+            return future, True
+
+    def resolve(self, key, value=None, error=None):
+        with self._lock:
+            future = self._flights.pop(key, None)
+        if future is None:
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(value)
+
+    def do(self, key, compute):
+        future, owner = self.claim(key)
+        if not owner:
+            return future.result()
+        try:
+            value = compute()
+        except BaseException as e:
+            self.resolve(key, error=e)
+            raise
+        self.resolve(key, value)
+        return value
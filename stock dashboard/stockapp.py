@@ -1,14 +1,13 @@
 import streamlit as st
-import yfinance as yf
-import plotly.graph_objects as go
-from PIL import Image
-import io
-import requests
-from statsmodels.tsa.holtwinters import ExponentialSmoothing, SimpleExpSmoothing
-import pandas as pd
-from statsmodels.tsa.arima.model import ARIMA
-from statsmodels.tsa.stattools import adfuller
+from concurrent.futures import ProcessPoolExecutor
 from streamlit_option_menu import option_menu
+from forecast_cache import ForecastCache
+from artifacts import precomputed_summary
+from Dashboard import get_chart_factory, get_logo_cache, get_price_store, load_panel
+from live_view import live_panel
+from charts import CHART_TYPES, LINE, PLOT_CONTAINER_STYLE
+# statsmodels and the forecasting modules are imported inside the
+# Forecasting branch, so the Dashboard never pays for them.
 
 
 st.set_page_config(
@@ -17,37 +16,25 @@ st.set_page_config(
     layout="wide"  
 )
 
-logo_urls = {
-    'GOOGL': 'https://logo.clearbit.com/google.com',
-    'AAPL': 'https://logo.clearbit.com/apple.com',
-    'MSFT': 'https://logo.clearbit.com/microsoft.com',
-    'NVDA': 'https://logo.clearbit.com/nvidia.com',
-    'TSLA': 'https://logo.clearbit.com/tesla.com',
-    'INTC': 'https://logo.clearbit.com/intel.com'
-}
+@st.cache_resource
+def get_forecast_cache():
+    return ForecastCache()
+
+@st.cache_resource
+def get_process_pool():
+    return ProcessPoolExecutor()
 
 def get_stock_data(tickers):
-    data = {}
-    for ticker in tickers:
-        stock = yf.Ticker(ticker)
-        hist = stock.history(period="1y")  
-        data[ticker] = hist
-    return data
-
-def get_company_logo(ticker):
-    return logo_urls.get(ticker, 'https://via.placeholder.com/150')  
-
-def forecast_stock_data(df):
-    model = ExponentialSmoothing(df['Close'], trend='add', seasonal='add', seasonal_periods=252)
-    model_fit = model.fit()
-    forecast = model_fit.forecast(steps=30)  
-    return forecast
+    panel, errors = load_panel(tickers)
+    if errors:
+        st.warning("Failed to fetch: " + ", ".join(f"{t} ({e})" for t, e in errors.items()))
+    return panel
 
 with st.sidebar:
     selected = option_menu(
         menu_title=None,
-        options=["Dashboard", "Forecasting"],
-        icons=["bar-chart", "calendar"],
+        options=["Dashboard", "Forecasting", "Screener"],
+        icons=["bar-chart", "calendar", "funnel"],
         menu_icon="cast",
         default_index=0
     )
@@ -59,10 +46,19 @@ if selected == "Dashboard":
 
     tickers_input = st.sidebar.text_area("Masukkan Ticker Saham (pisahkan dengan koma)", value="GOOGL, AAPL, MSFT, NVDA, TSLA, INTC")
     tickers = [ticker.strip().upper() for ticker in tickers_input.split(',') if ticker.strip()]
+    live_mode = st.sidebar.toggle("Live mode", value=False)
 
     if tickers:
      
         data = get_stock_data(tickers)
+        tickers = [ticker for ticker in tickers if ticker in data]
+        if not tickers:
+            st.stop()
+        summary = precomputed_summary(data, tickers)
+        if live_mode:
+            st.subheader("Live")
+            live_panel(tickers)
+            st.divider()
         num_columns = len(tickers)
         cols = st.columns(num_columns)
 
@@ -70,23 +66,23 @@ if selected == "Dashboard":
         for ticker in tickers:
             chart_types[ticker] = st.sidebar.selectbox(
                 f"Pilih jenis grafik untuk {ticker}",
-                ('Candlestick dengan Volume', 'Line Plot'),
+                CHART_TYPES,
                 index=0  
             )
 
+        st.markdown(PLOT_CONTAINER_STYLE, unsafe_allow_html=True)
+        get_logo_cache().prefetch(tickers)
         for idx, ticker in enumerate(tickers):
             with cols[idx]:
-                logo_url = get_company_logo(ticker)
-                response = requests.get(logo_url)
-                logo = Image.open(io.BytesIO(response.content))
+                logo_src = get_logo_cache().src(ticker)
 
                 df = data[ticker]
-                current_value = df['Close'].iloc[-1]
-                previous_value = df['Close'].iloc[-2]
-                last_date = df.index[-1].strftime('%Y-%m-%d')
+                row = summary.loc[ticker]
+                current_value = row['Close']
+                last_date = row['Date'].strftime('%Y-%m-%d')
 
-                performance_color = 'green' if current_value > previous_value else 'red'
-                performance_text = 'Up' if current_value > previous_value else 'Down'
+                performance_color = 'green' if row['Status'] == 'Up' else 'red'
+                performance_text = row['Status']
 
                 st.markdown(f"""
                 <div style="
@@ -98,7 +94,7 @@ if selected == "Dashboard":
                     margin: 10px;
                 ">
                     <h3>{ticker}</h3>
-                    <img src="{logo_url}" width="100" style="border-radius: 8px;" />
+                    <img src="{logo_src}" width="100" style="border-radius: 8px;" />
                     <p>Current Price: ${current_value:,.2f}</p>
                     <p style="color:{performance_color}; font-weight:bold;">{performance_text}</p>
                 </div>
@@ -107,9 +103,7 @@ if selected == "Dashboard":
             st.divider()
 
      
-            open_price = df['Open'][0]
-            close_price = df['Close'][0]
-            percentage_change = ((close_price - open_price) / open_price) * 100
+            percentage_change = row['Day Change %']
             if percentage_change >= 0:
                 change_color = "#4CAF50"  
                 change_text = f"+{percentage_change:.2f}%"
@@ -122,76 +116,9 @@ if selected == "Dashboard":
                 with st.container():
                     st.subheader(f"{ticker} Stock")
 
-                    fig = go.Figure()
-
-                    if chart_types[ticker] == 'Candlestick dengan Volume':
-                      
-                        fig.add_trace(go.Candlestick(
-                            x=df.index,
-                            open=df['Open'],
-                            high=df['High'],
-                            low=df['Low'],
-                            close=df['Close'],
-                            name='Candlestick'
-                        ))
-
-                        fig.add_trace(go.Bar(
-                            x=df.index,
-                            y=df['Volume'],
-                            name='Volume',
-                            yaxis='y2',
-                            marker=dict(color='rgba(0, 100, 250, 0.5)')
-                        ))
-
-                        fig.update_layout(
-                            xaxis_title='Tanggal',
-                            yaxis_title='Harga',
-                            yaxis2=dict(
-                                title='Volume',
-                                overlaying='y',
-                                side='right'
-                            ),
-                            xaxis_rangeslider_visible=False
-                        )
-                    else:
-                       
-                        fig.add_trace(go.Scatter(
-                            x=df.index,
-                            y=df['Open'],
-                            mode='lines',
-                            name='Harga Pembuka',
-                            line=dict(color='royalblue')
-                        ))
-
-                        fig.add_trace(go.Scatter(
-                            x=df.index,
-                            y=df['Close'],
-                            mode='lines',
-                            name='Harga Penutup',
-                            line=dict(color='firebrick')
-                        ))
-
-                        fig.update_layout(
-                            title=f'Line Plot Harga Saham {ticker}',
-                            xaxis_title='Tanggal',
-                            yaxis_title='Harga',
-                        )
-
-                    with st.container():
-                        st.markdown("""
-                            <style>
-                            .plot-container {
-                                border: 2px solid #ffffff;
-                                border-radius: 12px;
-                                padding: 20px;
-                                box-shadow: 0px 4px 8px rgba(0,0,0,0.2);
-                                background-color: #ffffff;
-                                margin-top: 20px;
-                            }
-                         
-                            """, unsafe_allow_html=True)
-                        
-                        st.plotly_chart(fig, use_container_width=True)
+                    title = f'Line Plot Harga Saham {ticker}' if chart_types[ticker] == LINE else None
+                    fig = get_chart_factory().figure(ticker, chart_types[ticker], df, title=title)
+                    st.plotly_chart(fig, use_container_width=True)
 
             with col2:
                 
@@ -227,8 +154,8 @@ if selected == "Dashboard":
                                 box-shadow: 0px 4px 8px rgba(0,0,0,0.1);
                                 border: 1px solid #d3d3d3;
                             ">
-                                <p style="font-size: 1.1em; color: #ff9800;"><strong>Open:</strong> ${df['Open'][0]:,.2f}</p>
-                                <p style="font-size: 1.1em; color: #ff5722;"><strong>Close:</strong> ${df['Close'][0]:,.2f}</p>
+                                <p style="font-size: 1.1em; color: #ff9800;"><strong>Open:</strong> ${row['Open']:,.2f}</p>
+                                <p style="font-size: 1.1em; color: #ff5722;"><strong>Close:</strong> ${row['Close']:,.2f}</p>
                             </div>
                             <div style="
                                 background-color: #f0f8ff;
@@ -237,36 +164,35 @@ if selected == "Dashboard":
                                 box-shadow: 0px 4px 8px rgba(0,0,0,0.1);
                                 border: 1px solid #d3d3d3;
                             ">
-                                <p style="font-size: 1.1em; color: #2196F3;"><strong>High:</strong> ${df['High'][0]:,.2f}</p>
-                                <p style="font-size: 1.1em; color: #009688;"><strong>Low:</strong> ${df['Low'][0]:,.2f}</p>
+                                <p style="font-size: 1.1em; color: #2196F3;"><strong>High:</strong> ${row['High']:,.2f}</p>
+                                <p style="font-size: 1.1em; color: #009688;"><strong>Low:</strong> ${row['Low']:,.2f}</p>
                             </div>
                         </div>
                     </div>
                     """, unsafe_allow_html=True)
 
+        st.divider()
+        st.subheader("Market Summary")
+        st.dataframe(summary, use_container_width=True)
+
 elif selected == "Forecasting":
-   
+    import pandas as pd
+    import plotly.graph_objects as go
+    from downsample import decimate
+    from charts import line_trace
+    from artifacts import precomputed_forecasts
+    from batch_forecast import FEATURES, MODEL_NAMES, MODEL_PARAMS, iter_forecasts, make_jobs
+
     def get_stock_data(tickers):
-        data = {}
-        for ticker in tickers:
-            stock = yf.Ticker(ticker)
-            hist = stock.history(period="1y")  
-            hist = hist[['Open', 'High', 'Low', 'Close']]
-            data[ticker] = hist
-        return data
-
-    def forecast_exponential_smoothing(series, steps=40):
-        model = ExponentialSmoothing(series, trend='add', seasonal='add', seasonal_periods=20)
-        model_fit = model.fit()
-        forecast = model_fit.forecast(steps=steps)
-        conf_int = 0.02 * forecast  
-        return forecast, conf_int
-
-  
+        data, errors = get_price_store().get(tickers, period="1y")
+        if errors:
+            st.warning("Failed to fetch: " + ", ".join(f"{t} ({e})" for t, e in errors.items()))
+        return {ticker: hist[['Open', 'High', 'Low', 'Close']] for ticker, hist in data.items()}
+
     def plot_data_and_forecast(df, feature, forecast, conf_int, forecast_steps):
         fig = go.Figure()
 
-        fig.add_trace(go.Scatter(x=df.index, y=df[feature], mode='lines', name='Historical Data', line=dict(color='royalblue')))
+        fig.add_trace(line_trace(decimate(df[feature]), name='Historical Data', line=dict(color='royalblue')))
 
         last_date = df.index[-1]
         forecast_index = pd.date_range(start=last_date, periods=forecast_steps + 1, freq='B')[1:]
@@ -326,24 +252,50 @@ elif selected == "Forecasting":
 
         st.sidebar.header("Pengaturan")
         tickers = st.sidebar.text_input("Masukkan Ticker Saham (pisahkan dengan koma)", "GOOGL").split(',')
-        tickers = [ticker.strip() for ticker in tickers]
-        
+        tickers = [ticker.strip() for ticker in tickers if ticker.strip()]
+        model = st.sidebar.selectbox("Model", list(MODEL_NAMES), format_func=MODEL_NAMES.get)
+
         if tickers:
             data = get_stock_data(tickers)
-
-            ticker = tickers[0]
-            df = data[ticker]
             forecast_steps = 40  
-            features = ['Open', 'High', 'Low', 'Close']
+            features = FEATURES
+
+            placeholders = {}
+            for ticker in tickers:
+                if ticker not in data:
+                    continue
+                df = data[ticker]
+                for feature in features:
+                    placeholders[ticker, feature] = st.empty()
+                    if len(df[feature].dropna()) <= 10:
+                        placeholders[ticker, feature].write(f"<div class='card'><strong>{feature}:</strong> Not enough data to forecast.</div>", unsafe_allow_html=True)
+                    else:
+                        placeholders[ticker, feature].write(f"<div class='card'><strong>{feature} Price - Forecast of {ticker} Stock</strong> (computing...)</div>", unsafe_allow_html=True)
 
-            for feature in features:
-                series = df[feature].dropna()
-                if len(series) > 10: 
-                    forecast, conf_int = forecast_exponential_smoothing(series, steps=forecast_steps)
-                    fig = plot_data_and_forecast(df, feature, forecast, conf_int, forecast_steps)
+            def show_forecast(ticker, feature, forecast, conf_int):
+                with placeholders[ticker, feature].container():
+                    fig = plot_data_and_forecast(data[ticker], feature, forecast, conf_int, forecast_steps)
                     st.write(f"<div class='card'><strong>{feature} Price - Forecast of {ticker} Stock</strong></div>", unsafe_allow_html=True)
                     st.plotly_chart(fig, use_container_width=True)
-                else:
-                    st.write(f"<div class='card'><strong>{feature}:</strong> Not enough data to forecast.</div>", unsafe_allow_html=True)
 
-    forecast_page()
\ No newline at end of file
+            # Forecasts precompute.py already made from the latest bars are
+            # read from its artifacts; only the rest are fitted here.
+            precomputed = precomputed_forecasts(data, list(data), MODEL_PARAMS[model](forecast_steps))
+            for (ticker, feature), (forecast, conf_int) in precomputed.items():
+                if (ticker, feature) in placeholders:
+                    show_forecast(ticker, feature, forecast, conf_int)
+
+            jobs = [job for job in make_jobs(data, features=features, models=(model,), steps=forecast_steps)
+                    if (job.ticker, job.feature) not in precomputed]
+            for result in iter_forecasts(jobs, cache=get_forecast_cache(), executor=get_process_pool()):
+                if result.error:
+                    with placeholders[result.ticker, result.feature].container():
+                        st.write(f"<div class='card'><strong>{result.feature}:</strong> Forecast of {result.ticker} failed: {result.error}</div>", unsafe_allow_html=True)
+                    continue
+                show_forecast(result.ticker, result.feature, result.forecast, result.conf_int)
+
+    forecast_page()
+
+elif selected == "Screener":
+    from Screener import show_screener
+    show_screener()
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+
+HORIZONS = {'1W': 5, '1M': 21, '3M': 63, '6M': 126, '1Y': 252}
+YEAR = 252
+
+
+def align(data, field):
+    # Wide (date x ticker) frame of one OHLCV field; tickers trading on
+    # different calendars get NaN on the days they have no bar. Accepts a
+    # {ticker: frame} dict or a Panel.
+    if hasattr(data, 'wide'):
+        return data.wide(field).astype(float)
+    frame = pd.concat({ticker: df[field] for ticker, df in data.items()}, axis=1)
+    return frame.sort_index()
+
+
+def _last_valid(mask):
+    rows = np.arange(mask.shape[0])[:, None]
+    return np.where(mask, rows, -1).max(axis=0)
+
+
+def market_summary(data, horizons=HORIZONS, volume_window=20):
+    # One vectorized pass over the aligned OHLCV arrays of every ticker.
+    close_frame = align(data, 'Close')
+    tickers = close_frame.columns
+    dates = close_frame.index
+    close = close_frame.to_numpy(dtype=float)
+    open_ = align(data, 'Open').reindex(dates).to_numpy(dtype=float)
+    high = align(data, 'High').reindex(dates).to_numpy(dtype=float)
+    low = align(data, 'Low').reindex(dates).to_numpy(dtype=float)
+    volume = align(data, 'Volume').reindex(dates).to_numpy(dtype=float)
+    cols = np.arange(close.shape[1])
+
+    valid = ~np.isnan(close)
+    last = _last_valid(valid)
+    before_last = valid.copy()
+    before_last[last, cols] = False
+    previous = _last_valid(before_last)
+    previous = np.where(previous < 0, last, previous)
+
+    current_close = close[last, cols]
+    previous_close = close[previous, cols]
+    change = current_close - previous_close
+
+    summary = pd.DataFrame({
+        'Date': dates[last],
+        'Close': current_close,
+        'Previous Close': previous_close,
+        'Change': change,
+        'Change %': change / previous_close * 100,
+        'Status': np.where(current_close > previous_close, 'Up', 'Down'),
+        'Open': open_[last, cols],
+        'High': high[last, cols],
+        'Low': low[last, cols],
+        'Day Change %': (current_close - open_[last, cols]) / open_[last, cols] * 100,
+    }, index=tickers)
+
+    window = slice(max(len(dates) - YEAR, 0), None)
+    with np.errstate(all='ignore'):
+        summary['52W High'] = np.nanmax(high[window], axis=0)
+        summary['52W Low'] = np.nanmin(low[window], axis=0)
+        summary['From 52W High %'] = (current_close / summary['52W High'].to_numpy() - 1) * 100
+
+        filled = close_frame.ffill().to_numpy(dtype=float)
+        for name, bars in horizons.items():
+            base_row = last - bars
+            base = np.where(base_row >= 0, filled[np.clip(base_row, 0, None), cols], np.nan)
+            summary[f"Return {name} %"] = (current_close / base - 1) * 100
+
+        summary['Avg Volume'] = np.nanmean(volume[-volume_window:], axis=0)
+    summary.index.name = 'Ticker'
+    return summary
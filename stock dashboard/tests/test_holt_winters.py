@@ -0,0 +1,135 @@
+import warnings
+
+import numpy as np
+import pytest
+from statsmodels.tsa.holtwinters import ExponentialSmoothing
+
+from forecast_cache import ForecastCache
+from holt_winters import IncrementalHoltWinters, forecast_incremental
+from providers import SyntheticProvider
+
+
+SEASONAL_PERIODS = 20
+STEPS = 30
+# Largest relative gap over the horizon allowed between a warm-started
+# forecast and a full re-optimized refit on the same bars, up to the
+# default refit_every=20 new bars.
+REFIT_RTOL = 0.02
+
+
+@pytest.fixture(scope='module')
+def close():
+    return SyntheticProvider(end='2024-06-28', days=400).history('AAPL', period='max')['Close']
+
+
+def _statsmodels(values, fit_kwargs=None, **model_kwargs):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        model = ExponentialSmoothing(np.asarray(values, dtype=float), trend='add', seasonal='add',
+                                     seasonal_periods=SEASONAL_PERIODS, **model_kwargs)
+        return model.fit(**(fit_kwargs or {}))
+
+
+def _refit_with(params, values):
+    # statsmodels over the whole history, started from the first fit's
+    # initial states and run with its smoothing parameters, without
+    # re-optimizing: what the incremental state must reproduce.
+    fit_kwargs = dict(
+        smoothing_level=params['smoothing_level'],
+        smoothing_trend=params['smoothing_trend'],
+        smoothing_seasonal=params['smoothing_seasonal'],
+        optimized=False,
+    )
+    return _statsmodels(
+        values, fit_kwargs,
+        initialization_method='known',
+        initial_level=params['initial_level'],
+        initial_trend=params['initial_trend'],
+        initial_seasonal=params['initial_seasons'],
+    )
+
+
+def _incremental(series):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        return IncrementalHoltWinters(SEASONAL_PERIODS, refit_every=10 ** 6, drift_threshold=np.inf).fit(series)
+
+
+def test_update_matches_fixed_parameter_refit(close):
+    model = _incremental(close.iloc[:300])
+    for end in (301, 305, 320, 340):
+        assert model.extends(close.iloc[:end])
+        model.advance(close.iloc[:end])
+    assert model.refits == 1
+
+    reference = _refit_with(_statsmodels(close.iloc[:300]).params, close.iloc[:340])
+    np.testing.assert_allclose(model.forecast(STEPS).to_numpy(), reference.forecast(STEPS), rtol=1e-7)
+
+
+def test_rolling_window_keeps_incremental_state(close):
+    # The store serves a fixed-length window, so each new bar also drops the
+    # oldest one; the state must still be advanced rather than refitted.
+    model = _incremental(close.iloc[:300])
+    for shift in (1, 5, 20):
+        window = close.iloc[shift:300 + shift]
+        assert model.extends(window)
+        model.advance(window)
+    assert model.refits == 1
+    assert model.nobs == 300
+
+    reference = _refit_with(_statsmodels(close.iloc[:300]).params, close.iloc[:320])
+    np.testing.assert_allclose(model.forecast(STEPS).to_numpy(), reference.forecast(STEPS), rtol=1e-7)
+
+
+@pytest.mark.parametrize('shift', [0, 19])
+def test_warm_start_stays_close_to_full_refit(close, shift):
+    # Nineteen new bars, one short of the scheduled refit; `shift` drops as
+    # many from the front, as the store's rolling window does.
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        model = IncrementalHoltWinters(SEASONAL_PERIODS, drift_threshold=np.inf).fit(close.iloc[:300])
+        model.advance(close.iloc[shift:319])
+    assert model.refits == 1
+
+    refit = _statsmodels(close.iloc[shift:319]).forecast(STEPS)
+    np.testing.assert_allclose(model.forecast(STEPS).to_numpy(), refit, rtol=REFIT_RTOL)
+
+
+def test_needs_refit_triggers_refit(close):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        model = IncrementalHoltWinters(SEASONAL_PERIODS, refit_every=5, drift_threshold=np.inf).fit(close.iloc[:300])
+        model.advance(close.iloc[:304])
+        assert (model.refits, model.bars_since_fit) == (1, 4)
+        model.advance(close.iloc[:305])
+        assert (model.refits, model.bars_since_fit) == (2, 0)
+
+        # A jump far outside the in-sample residuals forces a refit before
+        # the schedule does.
+        model = IncrementalHoltWinters(SEASONAL_PERIODS, refit_every=10 ** 6).fit(close.iloc[:300])
+        jumped = close.iloc[:305].copy()
+        jumped.iloc[300:] *= 1.5
+        model.advance(jumped.iloc[:304])
+        assert not model.needs_refit() and model.refits == 1
+        model.advance(jumped)
+    assert model.refits == 2
+    assert model.bars_since_fit == 0
+
+
+def test_changed_history_is_not_an_extension(close):
+    model = _incremental(close.iloc[:300])
+    revised = close.iloc[:305].copy()
+    revised.iloc[299] *= 1.01
+    assert not model.extends(revised)
+    assert not model.extends(close.iloc[:290])
+
+
+def test_forecast_incremental_reuses_cached_state(close, tmp_path):
+    cache = ForecastCache(str(tmp_path))
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        forecast_incremental(cache, 'AAPL:Close', close.iloc[:300], STEPS, SEASONAL_PERIODS, refit_every=50)
+        forecast_incremental(cache, 'AAPL:Close', close.iloc[3:303], STEPS, SEASONAL_PERIODS, refit_every=50)
+    state = cache.get(f"hw-state-v2-AAPL_Close-{SEASONAL_PERIODS}")
+    assert state.refits == 1
+    assert state.bars_since_fit == 3
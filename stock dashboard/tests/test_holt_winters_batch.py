@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from batch_forecast import ForecastJob, _run_batched, holt_winters_many
+from bench_holt_winters import kernel_error, statsmodels_fit
+from forecast_cache import ForecastCache
+from holt_winters_batch import forecast_many
+from providers import SyntheticProvider
+
+
+SEASONAL_PERIODS = 20
+STEPS = 40
+
+
+@pytest.fixture(scope='module')
+def series():
+    provider = SyntheticProvider(end='2024-06-28', days=252)
+    return [provider.history(f"T{i:03d}", period='max')[feature]
+            for i in range(6) for feature in ('Open', 'Close')]
+
+
+@pytest.fixture(scope='module')
+def batch(series):
+    return forecast_many(series, STEPS, SEASONAL_PERIODS)
+
+
+def test_kernel_matches_statsmodels_recursions(series):
+    # With statsmodels' own parameters and initial states, the batched
+    # recursions must reproduce its one-step fitted values to rounding.
+    for s in series[:4]:
+        assert kernel_error(statsmodels_fit(s, SEASONAL_PERIODS), s) < 1e-8
+
+
+def test_forecasts_close_to_statsmodels(series, batch):
+    forecasts, model = batch
+    gaps, sse_ratios = [], []
+    for i, s in enumerate(series):
+        model_fit = statsmodels_fit(s, SEASONAL_PERIODS)
+        reference = model_fit.forecast(STEPS)
+        gaps.append(np.max(np.abs(forecasts[i].to_numpy() / reference - 1)))
+        sse_ratios.append(model.sse[i] / model_fit.sse)
+    assert np.median(gaps) < 0.01
+    assert np.median(sse_ratios) < 1.1
+
+
+def test_short_series_reported_as_errors(series):
+    short = series[0].iloc[:2 * SEASONAL_PERIODS - 1]
+    values = holt_winters_many([series[0], short], STEPS, SEASONAL_PERIODS)
+    assert np.isfinite(values[0][0]).all()
+    assert isinstance(values[1], ValueError)
+
+
+def test_batched_jobs_surface_short_series(series, tmp_path):
+    short = series[0].iloc[:30]
+    jobs = [ForecastJob('LONG', 'Close', 'holt_winters_batch', series[0], STEPS),
+            ForecastJob('SHORT', 'Close', 'holt_winters_batch', short, STEPS)]
+    results = {r.ticker: r for r in _run_batched(jobs, ForecastCache(str(tmp_path)))}
+    assert results['LONG'].error is None
+    assert isinstance(results['LONG'].forecast, pd.Series)
+    assert results['SHORT'].forecast is None
+    assert 'Need at least 40 bars' in results['SHORT'].error
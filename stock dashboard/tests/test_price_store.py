@@ -0,0 +1,70 @@
+import pandas as pd
+import pytest
+
+from price_store import PriceStore
+from providers import SyntheticProvider, period_start
+
+
+@pytest.fixture
+def provider():
+    return SyntheticProvider()
+
+
+@pytest.fixture
+def store(provider):
+    return PriceStore(':memory:', provider=provider)
+
+
+def test_first_get_fetches_the_period(store, provider):
+    data, errors = store.get(['AAA', 'BBB'])
+    assert errors == {}
+    assert sorted(call[0] for call in provider.calls) == ['AAA', 'BBB']
+    expected = provider.history('AAA')
+    pd.testing.assert_frame_equal(data['AAA'], expected, check_freq=False, check_dtype=False)
+
+
+def test_fresh_bars_are_not_fetched_again(store, provider):
+    store.get(['AAA'])
+    provider.calls.clear()
+    store.get(['AAA'])
+    assert provider.calls == []
+
+
+def test_refresh_fetches_only_from_the_newest_bar(store, provider):
+    # An earlier refresh stored all but the last three bars, the newest of
+    # them written mid-session with a close that has since changed.
+    full = provider.history('AAA')
+    earlier = full.iloc[:-3].copy()
+    earlier.iloc[-1, earlier.columns.get_loc('Close')] = 1.0
+    store.write('AAA', earlier, covered_from=period_start('1y'))
+    provider.calls.clear()
+
+    data, errors = store.get(['AAA'], force=True)
+    assert errors == {}
+    assert provider.calls == [('AAA', earlier.index[-1], '1y')]
+    pd.testing.assert_frame_equal(data['AAA'], full, check_freq=False, check_dtype=False)
+
+
+def test_longer_period_widens_coverage(store, provider):
+    store.get(['AAA'], period='1y')
+    provider.calls.clear()
+    data, _ = store.get(['AAA'], period='2y')
+    assert provider.calls == [('AAA', None, '2y')]
+    assert data['AAA'].index[0] >= period_start('2y')
+    assert data['AAA'].index[0] < period_start('1y')
+
+    # A shorter period is then served from the stored bars.
+    provider.calls.clear()
+    data, _ = store.get(['AAA'], period='6mo')
+    assert provider.calls == []
+    assert data['AAA'].index[0] >= period_start('6mo')
+
+
+def test_failed_refresh_keeps_stored_bars(store, provider):
+    stored, _ = store.get(['AAA'])
+    # No bars at all from the provider: every attempt fails.
+    store.provider = SyntheticProvider(end=provider.end, days=0)
+    data, errors = store.get(['AAA', 'BBB'], force=True)
+    assert set(errors) == {'AAA', 'BBB'}
+    pd.testing.assert_frame_equal(data['AAA'], stored['AAA'])
+    assert 'BBB' not in data
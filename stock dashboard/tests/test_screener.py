@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from panel import Panel
+from providers import SyntheticProvider
+from screener import RollingCorrelation, parse_filter, returns_matrix, screen
+
+
+WINDOW = 60
+
+
+@pytest.fixture(scope='module')
+def returns():
+    provider = SyntheticProvider(end='2024-06-28', days=400)
+    data = {f"T{i:02d}": provider.history(f"T{i:02d}", period='max') for i in range(8)}
+    data['T01'] = data['T01'].iloc[::3]
+    return returns_matrix(Panel.from_frames(data))
+
+
+def _rolling_corr(returns, window=WINDOW):
+    # pandas' pairwise rolling correlation at the last row of `returns`.
+    return returns.rolling(window, min_periods=10).corr().xs(returns.index[-1], level=0)
+
+
+def test_rolling_panel_slides_the_window(returns):
+    # The panel keeps a fixed-length period, so every refresh adds bars at
+    # the end and drops as many from the front.
+    rolling = RollingCorrelation(WINDOW)
+    rolling.update(returns.iloc[:300])
+    for shift in (1, 3, 10):
+        result = rolling.update(returns.iloc[shift:300 + shift])
+    assert rolling.updates == 10
+    expected = _rolling_corr(returns.iloc[10:310])
+    pd.testing.assert_frame_equal(result.corr(), expected, check_names=False, atol=1e-9)
+
+
+def test_window_longer_than_panel(returns):
+    rolling = RollingCorrelation(250)
+    rolling.update(returns.iloc[:200])
+    result = rolling.update(returns.iloc[5:210])
+    expected = _rolling_corr(returns.iloc[5:210], window=250)
+    pd.testing.assert_frame_equal(result.corr(), expected, check_names=False, atol=1e-9)
+
+
+def test_revised_bar_rebuilds(returns):
+    rolling = RollingCorrelation(WINDOW)
+    rolling.update(returns.iloc[:300])
+    revised = returns.iloc[:301].copy()
+    revised.iloc[299, 0] += 0.01
+    result = rolling.update(revised)
+    assert rolling.updates == 0
+    pd.testing.assert_frame_equal(result.corr(), _rolling_corr(revised), check_names=False, atol=1e-9)
+
+
+def test_snapshot_is_not_changed_by_later_updates(returns):
+    rolling = RollingCorrelation(WINDOW)
+    first = rolling.update(returns.iloc[:300])
+    before = first.corr()
+    rolling.update(returns.iloc[5:305])
+    pd.testing.assert_frame_equal(first.corr(), before)
+
+
+def test_beta_is_regression_slope(returns):
+    result = RollingCorrelation(WINDOW).update(returns)
+    window = returns.iloc[-WINDOW:][['T03', 'T00']].dropna()
+    slope = np.polyfit(window['T00'], window['T03'], 1)[0]
+    assert result.beta('T00')['T03'] == pytest.approx(slope)
+    assert result.beta('T00')['T00'] == pytest.approx(1.0)
+
+
+def test_screen_filters():
+    summary = pd.DataFrame({'Change %': [3.0, -1.0, 2.5], 'From 52W High %': [-1.0, -2.0, -10.0]},
+                           index=['A', 'B', 'C'])
+    filters = [parse_filter('change % > 2', summary.columns)]
+    assert list(screen(summary, filters).index) == ['A', 'C']
+    assert list(screen(summary, filters, near_high=5).index) == ['A']
+    with pytest.raises(ValueError):
+        parse_filter('Volume > 1', summary.columns)